@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lib_manager.py 性能基准测试
+
+按不同规模生成模拟的 jars-config.yaml 和jar源目录（模块数、jar数、jar大小），
+分别计时 setup_directories、copy_jars、generate_pom_config、generate_readme，
+并区分冷/热页缓存。结果写入JSON文件，可与之前的结果对比以发现性能回退。
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import lib_manager  # noqa: E402
+from lib_manager import LibManager, CACHE_DIR, format_size  # noqa: E402
+
+
+# 结果文件格式版本
+RESULT_VERSION = 1
+
+# 计时的步骤，按执行顺序排列
+PHASES = ('load_config', 'setup_directories', 'copy_jars', 'generate_pom_config', 'generate_readme')
+
+# 页缓存状态
+#   cold - 每次运行前丢弃jar源文件的页缓存，并删除配置编译缓存
+#   warm - 先预热一次，jar源文件位于页缓存中
+CACHE_MODES = ('cold', 'warm')
+
+# 预设场景：(名称, 模块数, jar数, 单个jar大小)
+SCALES = {
+    'small': [
+        ('m10-j100-16k', 10, 100, 16 * 1024),
+        ('m10-j100-1m', 10, 100, 1024 * 1024),
+    ],
+    'medium': [
+        ('m100-j1000-16k', 100, 1000, 16 * 1024),
+        ('m100-j1000-1m', 100, 1000, 1024 * 1024),
+    ],
+    'large': [
+        ('m1000-j10000-16k', 1000, 10000, 16 * 1024),
+        ('m1000-j10000-256k', 1000, 10000, 256 * 1024),
+    ],
+}
+
+# 判断性能回退时忽略的最小耗时（秒），低于该值的差异视为噪声
+NOISE_FLOOR = 0.005
+
+
+def parse_size(text: str) -> int:
+    """解析 16k / 1m / 2g 形式的大小"""
+    units = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+class Scenario:
+    """一个基准测试场景及其生成的项目目录"""
+
+    def __init__(self, name: str, modules: int, jars: int, jar_size: int, work_dir: Path):
+        """初始化场景
+
+        Args:
+            name: 场景名称
+            modules: 子项目数量（另有一个公共模块）
+            jars: jar总数，轮流分配给公共模块和各子项目
+            jar_size: 单个jar大小（字节）
+            work_dir: 存放生成项目的目录
+        """
+        self.name = name
+        self.modules = modules
+        self.jars = jars
+        self.jar_size = jar_size
+        self.root = work_dir / name
+        self.tool_dir = self.root / "local-lib-manager"
+        self.config_file = self.tool_dir / "jars-config.yaml"
+        self.jar_dir = self.tool_dir / "jars"
+
+    @property
+    def total_bytes(self) -> int:
+        return self.jars * self.jar_size
+
+    def lib_dirs(self) -> List[Path]:
+        """所有lib目录"""
+        dirs = [self.root / "common" / "lib"]
+        dirs.extend(self.root / "modules" / f"module-{index:04d}" / "lib" for index in range(self.modules))
+        return dirs
+
+    def generate(self):
+        """生成配置文件、jar源目录和模块目录，已存在时直接复用"""
+        if self.config_file.exists():
+            return
+        print(f"[..] 生成场景 {self.name}: {self.modules} 个模块, {self.jars} 个jar, "
+              f"共 {format_size(self.total_bytes)}")
+        self.jar_dir.mkdir(parents=True, exist_ok=True)
+
+        # 所有jar共用一个随机数据块，只在开头写入各自的编号
+        block = os.urandom(min(self.jar_size, 1024 * 1024))
+        owners = [[] for _ in range(self.modules + 1)]
+        for index in range(self.jars):
+            jar_file = f"bench-lib-{index:05d}-1.0.{index % 10}.jar"
+            with open(self.jar_dir / jar_file, 'wb') as f:
+                header = f"{index:016d}".encode('ascii')
+                f.write(header)
+                remaining = self.jar_size - len(header)
+                while remaining > 0:
+                    chunk = block[:remaining]
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            owners[index % (self.modules + 1)].append({
+                'jar_file': jar_file,
+                'group_id': "com.example.bench",
+                'artifact_id': f"bench-lib-{index:05d}",
+                'version': f"1.0.{index % 10}",
+                'description': f"基准测试jar {index}"
+            })
+
+        for module_dir in self.lib_dirs():
+            module_dir.parent.mkdir(parents=True, exist_ok=True)
+            (module_dir.parent / "pom.xml").write_text("<project/>\n", encoding='utf-8')
+
+        config = {
+            'project': {'name': self.name, 'version': "1.0.0-SNAPSHOT", 'base_group': "com.example"},
+            'common': {'module_name': "common", 'lib_dir': "../common/lib", 'dependencies': owners[0]},
+            'modules': [{
+                'module_name': f"modules/module-{index:04d}",
+                'lib_dir': f"../modules/module-{index:04d}/lib",
+                'dependencies': owners[index + 1]
+            } for index in range(self.modules)],
+            'jar_sources': {'base_dir': "./jars"}
+        }
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False)
+        if hasattr(os, 'sync'):
+            os.sync()
+
+    def reset(self, cache: str):
+        """清除上一次运行的输出，使每次运行执行相同的工作量"""
+        for lib_dir in self.lib_dirs():
+            shutil.rmtree(lib_dir, ignore_errors=True)
+        generated = self.tool_dir / "generated-pom-configs.xml"
+        if generated.exists():
+            generated.unlink()
+        if cache == 'cold':
+            shutil.rmtree(self.tool_dir / CACHE_DIR, ignore_errors=True)
+            drop_page_cache([self.config_file] + sorted(self.jar_dir.iterdir()))
+
+
+def drop_page_cache(paths: List[Path]) -> bool:
+    """丢弃文件的页缓存（posix_fadvise DONTNEED），不需要root权限
+
+    Returns:
+        当前平台是否支持
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    if hasattr(os, 'sync'):
+        os.sync()
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def run_once(scenario: Scenario, workers: Optional[int]) -> Dict[str, float]:
+    """执行一次完整流程，返回各步骤耗时（秒）"""
+    timings = {}
+    with redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        manager = LibManager(str(scenario.config_file), workers=workers)
+        timings['load_config'] = time.perf_counter() - started
+
+        for phase in PHASES[1:]:
+            started = time.perf_counter()
+            getattr(manager, phase)()
+            timings[phase] = time.perf_counter() - started
+    return timings
+
+
+def run_scenario(scenario: Scenario, caches: List[str], repeat: int, workers: Optional[int]) -> List[Dict]:
+    """按各页缓存状态多次运行场景
+
+    Returns:
+        结果记录列表，每个 (场景, 页缓存状态, 步骤) 一条
+    """
+    records = []
+    for cache in caches:
+        if cache == 'warm':
+            scenario.reset(cache)
+            run_once(scenario, workers)
+        samples = {phase: [] for phase in PHASES}
+        for _ in range(repeat):
+            scenario.reset(cache)
+            for phase, seconds in run_once(scenario, workers).items():
+                samples[phase].append(seconds)
+
+        for phase in PHASES:
+            median = statistics.median(samples[phase])
+            record = {
+                'scenario': scenario.name,
+                'modules': scenario.modules,
+                'jars': scenario.jars,
+                'jar_size': scenario.jar_size,
+                'cache': cache,
+                'phase': phase,
+                'samples': samples[phase],
+                'median': median,
+                'min': min(samples[phase])
+            }
+            if phase == 'copy_jars' and median > 0:
+                record['bytes'] = scenario.total_bytes
+                record['throughput'] = scenario.total_bytes / median
+            records.append(record)
+            rate = f"  {format_size(int(record['throughput']))}/s" if 'throughput' in record else ''
+            print(f"  {scenario.name:<20} {cache:<5} {phase:<20} "
+                  f"中位 {median * 1000:9.1f}ms  最小 {record['min'] * 1000:9.1f}ms{rate}")
+    return records
+
+
+def git_revision() -> Optional[str]:
+    """lib_manager.py 所在仓库的当前提交"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).resolve().parent,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def compare(records: List[Dict], baseline_file: Path, threshold: float) -> int:
+    """与基线结果对比，打印变慢超过阈值的步骤
+
+    Returns:
+        性能回退的数量
+    """
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {(r['scenario'], r['cache'], r['phase']): r for r in json.load(f)['results']}
+
+    print(f"\n=== 与基线对比: {baseline_file} ===")
+    regressions = 0
+    for record in records:
+        base = baseline.get((record['scenario'], record['cache'], record['phase']))
+        if base is None:
+            continue
+        change = (record['median'] - base['median']) / base['median'] if base['median'] else 0.0
+        label = f"{record['scenario']} {record['cache']} {record['phase']}"
+        if change > threshold and record['median'] - base['median'] > NOISE_FLOOR:
+            regressions += 1
+            print(f"  [WARN] {label}: {base['median'] * 1000:.1f}ms -> {record['median'] * 1000:.1f}ms "
+                  f"(+{change:.0%})")
+        else:
+            print(f"  [OK] {label}: {change:+.0%}")
+    print(f"发现 {regressions} 个性能回退（阈值 {threshold:.0%}）\n")
+    return regressions
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description='lib_manager.py 性能基准测试',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例用法:
+  %(prog)s                                   # 运行small规模
+  %(prog)s --scale small medium              # 运行多个规模
+  %(prog)s --modules 500 --jars 5000 --jar-size 64k   # 自定义场景
+  %(prog)s --output new.json --baseline old.json       # 与之前的结果对比
+        """
+    )
+    parser.add_argument('--scale', nargs='+', choices=sorted(SCALES), default=['small'],
+                        help='预设规模 (默认: small)')
+    parser.add_argument('--modules', type=int, help='自定义场景的模块数（指定后忽略--scale）')
+    parser.add_argument('--jars', type=int, default=100, help='自定义场景的jar数 (默认: 100)')
+    parser.add_argument('--jar-size', default='16k', help='自定义场景的单个jar大小，如16k、1m (默认: 16k)')
+    parser.add_argument('--cache', nargs='+', choices=CACHE_MODES, default=list(CACHE_MODES),
+                        help='页缓存状态 (默认: cold warm)')
+    parser.add_argument('--repeat', type=int, default=3, help='每种页缓存状态的运行次数 (默认: 3)')
+    parser.add_argument('--workers', type=int, help='传给LibManager的并行线程数')
+    parser.add_argument('--work-dir', help='生成的项目存放目录，指定时保留以便重复使用 (默认: 临时目录)')
+    parser.add_argument('--output', default='benchmark-results.json', help='结果文件 (默认: benchmark-results.json)')
+    parser.add_argument('--baseline', help='基线结果文件，变慢超过阈值时以退出码1结束')
+    parser.add_argument('--threshold', type=float, default=0.2, help='性能回退阈值 (默认: 0.2，即慢20%%)')
+    args = parser.parse_args()
+
+    if args.modules is not None:
+        size = parse_size(args.jar_size)
+        definitions = [(f"m{args.modules}-j{args.jars}-{args.jar_size.lower()}", args.modules, args.jars, size)]
+    else:
+        definitions = [definition for scale in args.scale for definition in SCALES[scale]]
+
+    if 'cold' in args.cache and not hasattr(os, 'posix_fadvise'):
+        print("[WARN] 当前平台不支持posix_fadvise，cold结果只删除配置缓存，不丢弃页缓存")
+
+    work_dir = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix='lib-manager-bench-'))
+    records = []
+    try:
+        for name, modules, jars, jar_size in definitions:
+            scenario = Scenario(name, modules, jars, jar_size, work_dir)
+            scenario.generate()
+            records.extend(run_scenario(scenario, args.cache, args.repeat, args.workers))
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    result = {
+        'version': RESULT_VERSION,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'yaml_loader': lib_manager.YAML_LOADER.__name__,
+        'workers': args.workers or lib_manager.DEFAULT_WORKERS,
+        'repeat': args.repeat,
+        'results': records
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"\n[OK] 结果已写入: {args.output}")
+
+    if args.baseline and compare(records, Path(args.baseline), args.threshold) > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
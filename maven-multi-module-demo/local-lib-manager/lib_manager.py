@@ -8,44 +8,1964 @@ Maven本地Jar依赖管理工具
 2. 复制jar文件到指定位置
 3. 自动生成maven-install-plugin配置
 4. 支持公共模块和子项目私有依赖
+5. 支持增量同步（基于清单文件跳过未变化的jar）
+6. 并行复制，优先使用reflink/copy_file_range/sendfile零拷贝
+7. 链接模式：jar去重存储一份，lib目录通过硬链接/符号链接引用
+8. 支持多个jar源目录，通过带缓存的索引查找jar
+9. 从jar内的pom.properties自动识别/校验GAV坐标
+10. 直接安装jar到Maven本地仓库，无需在每次构建时执行install-file
+11. 直接修改各模块pom.xml（保留格式和注释，内容不变时不写文件）
+12. 配置文件编译缓存，优先使用libyaml加速解析
+13. 操作计划：各步骤编译为mkdir/copy/link/write操作图，支持预览和并行执行
+14. 监视模式：配置或jar变化时只同步受影响的文件
+15. 类冲突检查：按模块classpath报告重复类、拆分包和同一构件的多个版本
+16. jars.lock锁文件，并行校验源jar和lib目录中jar的SHA-256
+17. 清理lib目录中不再由配置引用的jar
+18. 可复用的依赖集合，按模块路径模式批量声明模块
+19. 运行剖析：按步骤、操作类型和源目录统计耗时与读写字节数
+20. 批量模式：一个进程处理多个配置文件，共用jar索引和哈希缓存
+21. 离线包：jar去重后与锁文件、生成的配置一起导出为一个文件，在离线环境中并行恢复
+22. 传递依赖检查：读取jar内嵌的pom.xml，报告既不在本地lib中也未由pom.xml管理的依赖
 """
 
 import os
+import re
 import sys
+import json
+import mmap
+import errno
+import glob
 import shutil
+import hashlib
+import heapq
+import threading
+import time
+import zipfile
 import yaml
 import argparse
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from xml.etree import ElementTree as ET
 from xml.dom import minidom
 
 
+# 默认配置文件名（批量模式在目录中搜索该文件）
+DEFAULT_CONFIG_FILE = "jars-config.yaml"
+
+# 每个lib目录中记录已同步jar信息的清单文件
+MANIFEST_FILE = ".lib-manifest.json"
+
+# jar源目录下的内容寻址存储目录
+STORE_DIR = ".store"
+
+# 与配置文件同目录的锁文件，记录每个依赖jar的SHA-256和大小
+LOCK_FILE = "jars.lock"
+
+# 离线包默认文件名，以及离线包中描述文件内容的清单
+DEFAULT_BUNDLE_FILE = "jars-bundle.zip"
+BUNDLE_MANIFEST = "bundle.json"
+
+# 配置文件同级的缓存目录，以及其中的哈希缓存和索引缓存文件
+# （缓存不放在jar源目录中，否则写缓存会改变源目录的修改时间）
+CACHE_DIR = ".lib-cache"
+HASH_CACHE_FILE = "jar-hashes.json"
+INDEX_CACHE_FILE = "jar-index.json"
+GAV_CACHE_FILE = "jar-gav.json"
+CLASS_INDEX_FILE = "jar-classes.json"
+POM_CACHE_FILE = "jar-poms.json"
+
+# 配置文件编译缓存的格式版本，缓存结构变化时递增
+CONFIG_SNAPSHOT_VERSION = 2
+
+# 优先使用libyaml的C实现，未安装时回退到纯Python实现
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# 依赖的Maven坐标字段
+GAV_KEYS = ('group_id', 'artifact_id', 'version')
+
+# 不会传递到使用方classpath的依赖范围
+NON_TRANSITIVE_SCOPES = ('test', 'provided', 'system', 'import')
+
+# 生成的POM配置中本地jar的安装方式
+#   plugin     - 每次构建通过maven-install-plugin安装（默认）
+#   local-repo - 由 lib_manager.py --install-local-repo 预先安装，不生成插件配置
+#   profile    - 每个jar的安装包装在profile中，仅当本地仓库缺少该构件时激活
+POM_INSTALL_MODES = ('plugin', 'local-repo', 'profile')
+
+# 操作计划包含的步骤（--all执行的步骤）
+PLAN_PHASES = ('setup', 'copy', 'generate', 'readme')
+
+# 只在显式指定时加入操作计划的步骤
+OPTIONAL_PLAN_PHASES = ('prune',)
+
+# --profile 默认的结果文件和记录的最慢文件操作数量
+DEFAULT_PROFILE_FILE = "lib-manager-profile.json"
+DEFAULT_PROFILE_TOP = 10
+
+# 监视模式默认轮询间隔（秒）
+DEFAULT_WATCH_INTERVAL = 0.5
+
+# profile模式下判断构件是否已安装的默认本地仓库路径
+# （Maven的文件激活条件只支持${basedir}和系统属性，不支持${settings.localRepository}）
+DEFAULT_PROFILE_REPO = "${user.home}/.m2/repository"
+
+# 多个源目录中存在同名jar时的选择规则
+JAR_PRECEDENCES = ('first', 'newest')
+
+# 支持的jar同步方式
+LINK_MODES = ('copy', 'hardlink', 'symlink')
+
+# 计算文件哈希时的读取块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 默认复制线程数（与ThreadPoolExecutor的默认值一致）
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Linux FICLONE ioctl，用于在btrfs/xfs等文件系统上创建reflink
+FICLONE = 0x40049409
+
+# 零拷贝调用不支持时回退到普通复制的错误码
+_ZERO_COPY_UNSUPPORTED = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF,
+    errno.EPERM, errno.ENOTTY, getattr(errno, 'EOPNOTSUPP', errno.ENOTSUP), errno.ENOTSUP
+}
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def file_digest(path: Path, algorithm: str = 'sha256', use_mmap: bool = False) -> str:
+    """计算文件摘要
+
+    Args:
+        path: 文件路径
+        algorithm: hashlib支持的算法名
+        use_mmap: 是否通过mmap读取（避免把文件内容复制到Python缓冲区），
+                  mmap不可用时回退到分块读取
+
+    Returns:
+        十六进制摘要
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap and size > 0:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        for offset in range(0, size, HASH_CHUNK_SIZE):
+                            digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+                    finally:
+                        view.release()
+                return digest.hexdigest()
+            except (OSError, ValueError):
+                digest = hashlib.new(algorithm)
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    """计算文件的SHA-256"""
+    return file_digest(path, 'sha256')
+
+
+def _copy_fd(src_fd: int, dst_fd: int, size: int, digest=None) -> str:
+    """在两个文件描述符之间复制数据
+
+    依次尝试reflink、copy_file_range、sendfile，都不可用时回退到普通读写。
+    普通读写时数据经过用户态，顺便更新digest，无需再读一遍文件计算摘要。
+
+    Args:
+        digest: hashlib对象，仅在返回 'copy' 时被更新
+
+    Returns:
+        实际使用的复制方式
+    """
+    if fcntl is not None and sys.platform.startswith('linux'):
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return 'reflink'
+        except OSError:
+            pass
+
+    for method in ('copy_file_range', 'sendfile'):
+        if not hasattr(os, method) or (method == 'sendfile' and not sys.platform.startswith('linux')):
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if method == 'copy_file_range':
+                    sent = os.copy_file_range(src_fd, dst_fd, size - offset)
+                else:
+                    sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            if offset == size:
+                return method
+            if offset:
+                raise OSError(errno.EIO, f"{method} 复制不完整: {offset}/{size} 字节")
+            # 一个字节都没有复制（部分文件系统直接返回0），换下一种方式
+        except OSError as e:
+            # 只有在尚未写入任何数据时才能安全回退
+            if offset or e.errno not in _ZERO_COPY_UNSUPPORTED:
+                raise
+
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    with open(src_fd, 'rb', closefd=False) as fsrc, open(dst_fd, 'wb', closefd=False) as fdst:
+        if digest is None:
+            shutil.copyfileobj(fsrc, fdst, HASH_CHUNK_SIZE)
+        else:
+            for chunk in iter(partial(fsrc.read, HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                fdst.write(chunk)
+    return 'copy'
+
+
+# 操作计划的工作线程共用的输出锁，保证每条消息完整地占一行
+_OUTPUT_LOCK = threading.Lock()
+
+
+def log(message: str):
+    """线程安全地打印一行消息（在并行执行的操作中使用）"""
+    with _OUTPUT_LOCK:
+        print(message, flush=True)
+
+
+def copy_file_fast(src: Path, dst: Path, digest=None) -> str:
+    """复制文件并保留元数据（与shutil.copy2语义一致）
+
+    先写入同目录下的临时文件再原子替换，避免并发读取到半个jar。
+
+    Args:
+        src: 源文件
+        dst: 目标文件
+        digest: hashlib对象，回退到普通读写（返回 'copy'）时在复制过程中更新
+
+    Returns:
+        实际使用的复制方式
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(src, 'rb') as fsrc, open(tmp, 'wb') as fdst:
+            src_stat = os.fstat(fsrc.fileno())
+            method = _copy_fd(fsrc.fileno(), fdst.fileno(), src_stat.st_size, digest)
+        # 用已打开文件的fstat结果复制权限和时间，不再按路径stat源文件
+        os.chmod(tmp, src_stat.st_mode & 0o7777)
+        os.utime(tmp, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.replace(tmp, dst)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    return method
+
+
+def format_size(num_bytes: int) -> str:
+    """格式化字节数为易读形式"""
+    if num_bytes < 1024:
+        return f"{num_bytes}B"
+    size = float(num_bytes)
+    for unit in ('KB', 'MB'):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+    return f"{size / 1024:.1f}GB"
+
+
+class LibManifest:
+    """lib目录的同步清单
+
+    记录每个jar的大小、修改时间(纳秒)和SHA-256，用于增量同步时
+    判断目标文件是否需要重新复制。记录以jar相对lib目录的路径（/分隔）为键。
+    """
+
+    def __init__(self, lib_dir: Path):
+        """初始化清单
+
+        Args:
+            lib_dir: lib目录路径
+        """
+        self.lib_dir = lib_dir
+        self.path = lib_dir / MANIFEST_FILE
+        self.entries = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        """读取清单文件，文件损坏时视为空清单"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('jars', {})
+        except (ValueError, OSError):
+            self.entries = {}
+
+    def key(self, path: Path) -> str:
+        """lib目录中文件对应的清单键"""
+        return path.relative_to(self.lib_dir).as_posix()
+
+    def get(self, jar_file: str) -> Dict:
+        """获取jar的清单记录"""
+        return self.entries.get(jar_file)
+
+    def update(self, jar_file: str, stat: os.stat_result, sha256: str):
+        """更新jar的清单记录
+
+        Args:
+            jar_file: 清单键，见 key()
+            stat: 目标文件的stat结果
+            sha256: 文件SHA-256
+        """
+        self.entries[jar_file] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256
+        }
+        self.dirty = True
+
+    def remove(self, jar_file: str):
+        """删除jar的清单记录"""
+        if self.entries.pop(jar_file, None) is not None:
+            self.dirty = True
+
+    def matches(self, jar_file: str, stat: os.stat_result) -> bool:
+        """判断文件的大小和修改时间是否与清单记录一致"""
+        entry = self.entries.get(jar_file)
+        return (entry is not None
+                and entry['size'] == stat.st_size
+                and entry['mtime_ns'] == stat.st_mtime_ns)
+
+    def save(self):
+        """清单有变化时写回文件"""
+        if not self.dirty:
+            return
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'jars': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+class HashCache:
+    """文件SHA-256缓存
+
+    以文件绝对路径为键，记录大小、修改时间(纳秒)和SHA-256，
+    大小或修改时间变化时重新计算。线程安全。
+    """
+
+    def __init__(self, cache_file: Path):
+        """初始化缓存
+
+        Args:
+            cache_file: 缓存文件路径
+        """
+        self.path = cache_file
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """读取缓存文件，文件损坏时视为空缓存"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+        except (ValueError, OSError):
+            self.entries = {}
+
+    def sha256(self, path: Path, stat: os.stat_result = None) -> str:
+        """获取文件的SHA-256，命中缓存时不读取文件内容
+
+        Args:
+            path: 文件路径
+            stat: 文件的stat结果，为None时重新获取
+
+        Returns:
+            十六进制摘要
+        """
+        key = str(path)
+        if stat is None:
+            stat = path.stat()
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+
+        digest = file_sha256(path)
+        with self._lock:
+            self.entries[key] = [stat.st_size, stat.st_mtime_ns, digest]
+            self.dirty = True
+        return digest
+
+    def save(self):
+        """缓存有变化时写回文件"""
+        with self._lock:
+            if not self.dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'files': self.entries}, f, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+class JarStore:
+    """内容寻址的jar存储
+
+    每个不同内容的jar只保存一份，路径为 <root>/<sha前2位>/<sha>.jar，
+    各lib目录通过硬链接或符号链接引用。存储对象设为只读，避免通过某个
+    lib目录中的链接修改jar时同时破坏所有模块。
+    """
+
+    def __init__(self, root: Path, hash_cache: HashCache):
+        """初始化存储
+
+        Args:
+            root: 存储根目录
+            hash_cache: 用于计算源文件摘要的哈希缓存
+        """
+        self.root = root
+        self.hash_cache = hash_cache
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def object_path(self, sha256: str) -> Path:
+        """获取摘要对应的存储路径"""
+        return self.root / sha256[:2] / f"{sha256}.jar"
+
+    def _lock_for(self, sha256: str) -> threading.Lock:
+        """获取单个存储对象的锁，避免并发写入同一个对象"""
+        with self._locks_guard:
+            return self._locks.setdefault(sha256, threading.Lock())
+
+    def add(self, src: Path, src_stat: os.stat_result = None) -> Tuple[Path, str]:
+        """将jar加入存储，已存在且内容完好时直接返回
+
+        存储对象是源文件的独立副本（而非硬链接），源文件被原地修改时不会影响存储。
+        已有对象的大小或SHA-256（经哈希缓存，对象未变化时不读取内容）与源文件
+        不一致时重新生成；新对象是新的inode，指向损坏对象的链接随后会被重新创建。
+
+        Args:
+            src: 源jar文件
+            src_stat: 源文件的stat结果，为None时重新获取
+
+        Returns:
+            (存储对象路径, SHA-256)
+        """
+        if src_stat is None:
+            src_stat = src.stat()
+        sha256 = self.hash_cache.sha256(src, src_stat)
+        obj = self.object_path(sha256)
+        with self._lock_for(sha256):
+            try:
+                obj_stat = obj.stat()
+            except FileNotFoundError:
+                obj_stat = None
+            if obj_stat is not None and (obj_stat.st_size != src_stat.st_size
+                                         or self.hash_cache.sha256(obj, obj_stat) != sha256):
+                log(f"  [WARN] 存储对象已损坏，重新生成: {obj.name}")
+                obj_stat = None
+            if obj_stat is None:
+                obj.parent.mkdir(parents=True, exist_ok=True)
+                copy_file_fast(src, obj)
+                obj_stat = obj.stat()
+            if obj_stat.st_mode & 0o222:
+                os.chmod(obj, 0o444)
+        return obj, sha256
+
+
+def link_file(target: Path, dst: Path, mode: str) -> str:
+    """在dst处创建指向target的链接，原子替换已有文件
+
+    硬链接跨文件系统失败时回退为复制；符号链接使用相对路径，
+    便于整个仓库移动位置。
+
+    Args:
+        target: 链接目标（存储对象）
+        dst: 链接位置
+        mode: hardlink 或 symlink
+
+    Returns:
+        实际使用的方式
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if mode == 'symlink':
+            os.symlink(os.path.relpath(target, dst.parent), tmp)
+        else:
+            try:
+                os.link(target, tmp)
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                    raise
+                return copy_file_fast(target, dst)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.lexists(tmp):
+            tmp.unlink()
+        raise
+    return mode
+
+
+class JarIndex:
+    """多源目录jar索引
+
+    一次性扫描所有源目录，建立 jar文件名(相对路径) -> 实际路径 的内存索引，
+    并缓存到磁盘。缓存中记录每个子目录的修改时间，任一目录变化时只重新扫描
+    该源目录，避免在慢速存储（如NFS）上为每个依赖逐个stat。
+
+    同一个jar存在于多个源目录时，按precedence决定使用哪一个：
+    - first:  按配置顺序（base_dir优先，其次additional_dirs）
+    - newest: 使用修改时间最新的文件
+    """
+
+    def __init__(self, roots: List[Path], cache_file: Path, precedence: str = 'first'):
+        """初始化索引
+
+        Args:
+            roots: 源目录列表，按优先级从高到低排列
+            cache_file: 索引缓存文件路径
+            precedence: 重名jar的选择规则，first 或 newest
+        """
+        if precedence not in JAR_PRECEDENCES:
+            raise ValueError(f"不支持的jar优先级规则: {precedence}")
+        self.roots = roots
+        self.cache_file = cache_file
+        self.precedence = precedence
+        self.scans = {}
+        self.rescanned = []
+        self._candidates = {}
+        self._resolved = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    @staticmethod
+    def _scan_root(root: Path) -> Dict:
+        """扫描单个源目录
+
+        只读取目录项，不对jar文件做stat；以点开头的目录（如.store）被忽略。
+
+        Returns:
+            {'dirs': {相对路径: 修改时间}, 'jars': [相对路径, ...]}
+        """
+        dirs = {}
+        jars = []
+        stack = ['']
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(root, rel) if rel else str(root)
+            try:
+                dirs[rel] = os.stat(path).st_mtime_ns
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        child = f"{rel}/{entry.name}" if rel else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(child)
+                        elif entry.name.endswith('.jar'):
+                            jars.append(child)
+            except FileNotFoundError:
+                continue
+        return {'dirs': dirs, 'jars': sorted(jars)}
+
+    @staticmethod
+    def _is_fresh(root: Path, scan: Dict) -> bool:
+        """检查缓存的扫描结果是否仍然有效（所有目录修改时间未变）"""
+        for rel, mtime_ns in scan['dirs'].items():
+            try:
+                if os.stat(os.path.join(root, rel) if rel else root).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return bool(scan['dirs']) or not root.exists()
+
+    def _load_cache(self) -> Dict:
+        """读取索引缓存，文件损坏时视为空缓存"""
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('roots', {})
+        except (ValueError, OSError):
+            return {}
+
+    def refresh(self) -> List[Path]:
+        """按目录修改时间校验缓存，重新扫描发生变化的源目录
+
+        Returns:
+            本次重新扫描的源目录列表
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> List[Path]:
+        """refresh的实现，调用方持有锁"""
+        cached = self.scans or self._load_cache()
+        self.rescanned = []
+        scans = {}
+        for root in self.roots:
+            key = str(root)
+            scan = cached.get(key)
+            if scan is None or not self._is_fresh(root, scan):
+                scan = self._scan_root(root)
+                self.rescanned.append(root)
+            scans[key] = scan
+        self.scans = scans
+
+        if self.rescanned:
+            self._build()
+            self._save_cache()
+        elif not self._candidates:
+            self._build()
+        return self.rescanned
+
+    def _build(self):
+        """根据扫描结果建立文件名到候选路径的映射"""
+        candidates = {}
+        for root in self.roots:
+            for rel in self.scans[str(root)]['jars']:
+                candidates.setdefault(rel, []).append(root / rel)
+        self._candidates = candidates
+        self._resolved = {}
+
+    def _save_cache(self):
+        """写入索引缓存"""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'roots': self.scans}, f)
+        os.replace(tmp_path, self.cache_file)
+
+    def resolve(self, jar_file: str) -> Optional[Path]:
+        """查找jar文件的实际路径
+
+        Args:
+            jar_file: 配置中的jar文件名（可包含相对子目录）
+
+        Returns:
+            实际路径，所有源目录中都不存在时返回None
+        """
+        key = Path(jar_file).as_posix()
+        if key in self._resolved:
+            return self._resolved[key]
+
+        paths = self._candidates.get(key)
+        if not paths:
+            result = None
+        elif len(paths) == 1 or self.precedence == 'first':
+            result = paths[0]
+        else:
+            # 只有重名的jar才需要stat比较修改时间
+            result = max(paths, key=lambda p: p.stat().st_mtime_ns)
+        self._resolved[key] = result
+        return result
+
+    def names(self) -> List[str]:
+        """返回索引中所有jar的文件名（相对路径）"""
+        return list(self._candidates)
+
+    def shadowed(self) -> Dict[str, List[Path]]:
+        """返回在多个源目录中重复出现的jar"""
+        return {name: paths for name, paths in self._candidates.items() if len(paths) > 1}
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+
+def parse_properties(text: str) -> Dict[str, str]:
+    """解析简单的Java properties内容（pom.properties只包含key=value行）"""
+    props = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] in '#!':
+            continue
+        for sep in ('=', ':'):
+            if sep in line:
+                key, value = line.split(sep, 1)
+                props[key.strip()] = value.strip()
+                break
+    return props
+
+
+class JarCache:
+    """以jar的SHA-256为键的解析结果缓存
+
+    jar内容不变时不再打开jar；子类提供具体的读取方法。线程安全。
+    """
+
+    def __init__(self, hash_cache: HashCache, cache_file: Path):
+        """初始化缓存
+
+        Args:
+            hash_cache: 用于计算jar摘要的哈希缓存
+            cache_file: 解析结果缓存文件路径
+        """
+        self.hash_cache = hash_cache
+        self.cache_file = cache_file
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """读取缓存文件，文件损坏时视为空缓存"""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('jars', {})
+        except (ValueError, OSError):
+            self.entries = {}
+
+    def _cached(self, jar: Path, read) -> Dict:
+        """获取jar的解析结果，未命中缓存时调用read(jar)"""
+        sha256 = self.hash_cache.sha256(jar)
+        with self._lock:
+            cached = self.entries.get(sha256)
+        if cached is not None:
+            return cached
+
+        result = read(jar)
+        with self._lock:
+            self.entries[sha256] = result
+            self.dirty = True
+        return result
+
+    def save(self):
+        """缓存有变化时写回文件"""
+        with self._lock:
+            if not self.dirty:
+                return
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_file.with_name(self.cache_file.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'jars': self.entries}, f, sort_keys=True)
+            os.replace(tmp_path, self.cache_file)
+            self.dirty = False
+
+
+class JarInspector(JarCache):
+    """jar元数据检查器
+
+    只读取zip中央目录和 META-INF/maven/*/*/pom.properties 条目，
+    不解压任何class文件。结果以jar的SHA-256为键缓存到磁盘。
+    """
+
+    @staticmethod
+    def read_gav(jar: Path) -> Dict:
+        """从jar的pom.properties读取GAV坐标
+
+        jar中包含多个pom.properties（如shade打包）时，优先选择artifactId
+        与文件名前缀一致的那一个。
+
+        Returns:
+            {'group_id', 'artifact_id', 'version'}；没有Maven元数据时返回空字典，
+            不是合法zip时返回 {'error': 错误信息}
+        """
+        try:
+            with zipfile.ZipFile(jar) as zf:
+                names = [name for name in zf.namelist()
+                         if name.startswith('META-INF/maven/') and name.endswith('/pom.properties')]
+                candidates = []
+                for name in names:
+                    props = parse_properties(zf.read(name).decode('utf-8', errors='replace'))
+                    if all(key in props for key in ('groupId', 'artifactId', 'version')):
+                        candidates.append({
+                            'group_id': props['groupId'],
+                            'artifact_id': props['artifactId'],
+                            'version': props['version']
+                        })
+        except (zipfile.BadZipFile, OSError) as e:
+            return {'error': str(e)}
+
+        if not candidates:
+            return {}
+        for gav in candidates:
+            if jar.name.startswith(f"{gav['artifact_id']}-"):
+                return gav
+        return candidates[0]
+
+    def inspect(self, jar: Path) -> Dict:
+        """获取jar的GAV坐标，命中缓存时不打开jar
+
+        Args:
+            jar: jar文件路径
+
+        Returns:
+            同 read_gav
+        """
+        return self._cached(jar, self.read_gav)
+
+
+class ClassIndex(JarCache):
+    """jar类索引
+
+    只读取zip中央目录中的条目名，不解压任何class文件，得到每个jar包含的类。
+    结果以jar的SHA-256为键缓存到磁盘，jar内容不变时不再打开jar。
+    """
+
+    @staticmethod
+    def read_classes(jar: Path) -> Dict:
+        """读取jar中的类名
+
+        忽略 module-info、package-info 以及 META-INF 下的条目（如多版本jar的
+        META-INF/versions/*），它们不会与其他jar的类冲突。
+
+        Returns:
+            {'classes': [全限定类名, ...]}；不是合法zip时返回 {'error': 错误信息}
+        """
+        try:
+            with zipfile.ZipFile(jar) as zf:
+                names = zf.namelist()
+        except (zipfile.BadZipFile, OSError) as e:
+            return {'error': str(e)}
+
+        classes = []
+        for name in names:
+            if not name.endswith('.class') or name.startswith('META-INF/'):
+                continue
+            class_name = name[:-6].replace('/', '.')
+            if class_name.endswith(('module-info', 'package-info')):
+                continue
+            classes.append(class_name)
+        return {'classes': sorted(classes)}
+
+    def classes(self, jar: Path) -> Dict:
+        """获取jar中的类名，命中缓存时不打开jar
+
+        Args:
+            jar: jar文件路径
+
+        Returns:
+            同 read_classes
+        """
+        return self._cached(jar, self.read_classes)
+
+
+def parse_pom(source) -> ET.Element:
+    """解析pom.xml并去掉元素名中的命名空间
+
+    Args:
+        source: pom.xml的文件路径或内容（bytes）
+    """
+    if isinstance(source, Path):
+        root = ET.parse(source).getroot()
+    else:
+        root = ET.fromstring(source)
+    for elem in root.iter():
+        if isinstance(elem.tag, str):
+            elem.tag = elem.tag.rsplit('}', 1)[-1]
+    return root
+
+
+def pom_dependencies(root: ET.Element, path: str = 'dependencies') -> List[Dict]:
+    """读取pom中的依赖声明
+
+    Args:
+        root: parse_pom 的结果
+        path: 依赖列表所在路径，如 dependencyManagement/dependencies
+
+    Returns:
+        [{'group_id', 'artifact_id', 'version', 'scope', 'optional'}, ...]，
+        未声明的版本为None、范围为compile
+    """
+    dependencies = []
+    for elem in root.findall(f'{path}/dependency'):
+        dependencies.append({
+            'group_id': (elem.findtext('groupId') or '').strip(),
+            'artifact_id': (elem.findtext('artifactId') or '').strip(),
+            'version': (elem.findtext('version') or '').strip() or None,
+            'scope': (elem.findtext('scope') or '').strip() or 'compile',
+            'optional': (elem.findtext('optional') or '').strip() == 'true'
+        })
+    return dependencies
+
+
+class EmbeddedPomReader(JarCache):
+    """jar内嵌pom.xml读取器
+
+    读取 META-INF/maven/*/*/pom.xml 中声明的依赖，只保留会传递到使用方
+    classpath的依赖（排除test/provided/system范围和optional依赖）。
+    结果以jar的SHA-256为键缓存到磁盘，jar内容不变时不再打开jar。
+    """
+
+    @staticmethod
+    def _resolve(value: Optional[str], props: Dict[str, str]) -> Optional[str]:
+        """替换 ${...} 属性引用，无法解析的引用保持原样"""
+        for _ in range(5):
+            if not value or '${' not in value:
+                break
+            resolved = re.sub(r'\$\{([^}]+)\}', lambda m: props.get(m.group(1), m.group(0)), value)
+            if resolved == value:
+                break
+            value = resolved
+        return value
+
+    @classmethod
+    def read_pom(cls, jar: Path) -> Dict:
+        """从jar的pom.xml读取坐标和依赖
+
+        jar中包含多个pom.xml（如shade打包）时，优先选择artifactId
+        与文件名前缀一致的那一个。只解析pom.xml本身，不读取父POM，
+        因此由父POM管理版本、或引用了父POM中属性的依赖版本为None。
+
+        Returns:
+            {'gav': {...}, 'dependencies': [...]}；没有pom.xml时返回空字典，
+            不是合法zip或pom.xml无法解析时返回 {'error': 错误信息}
+        """
+        try:
+            with zipfile.ZipFile(jar) as zf:
+                names = [name for name in zf.namelist()
+                         if name.startswith('META-INF/maven/') and name.endswith('/pom.xml')]
+                if not names:
+                    return {}
+                name = next((name for name in names if jar.name.startswith(f"{name.split('/')[-2]}-")), names[0])
+                root = parse_pom(zf.read(name))
+        except (zipfile.BadZipFile, OSError, ET.ParseError) as e:
+            return {'error': str(e)}
+
+        parent = {key: (root.findtext(f'parent/{tag}') or '').strip()
+                  for key, tag in zip(GAV_KEYS, ('groupId', 'artifactId', 'version'))}
+        gav = {key: (root.findtext(tag) or '').strip() or parent[key]
+               for key, tag in zip(GAV_KEYS, ('groupId', 'artifactId', 'version'))}
+        props = {elem.tag: (elem.text or '').strip() for elem in root.findall('properties/*')}
+        for prefix in ('project.', 'pom.', ''):
+            props[f'{prefix}groupId'] = gav['group_id']
+            props[f'{prefix}artifactId'] = gav['artifact_id']
+            props[f'{prefix}version'] = gav['version']
+        props['project.parent.version'] = props['parent.version'] = parent['version']
+        props['project.parent.groupId'] = props['parent.groupId'] = parent['group_id']
+
+        dependencies = []
+        for dep in pom_dependencies(root):
+            if dep['scope'] in NON_TRANSITIVE_SCOPES or dep['optional']:
+                continue
+            version = cls._resolve(dep['version'], props)
+            dependencies.append({
+                'group_id': cls._resolve(dep['group_id'], props),
+                'artifact_id': cls._resolve(dep['artifact_id'], props),
+                'version': version if version and '${' not in version else None,
+                'scope': dep['scope']
+            })
+        return {'gav': gav, 'dependencies': dependencies}
+
+    def read(self, jar: Path) -> Dict:
+        """获取jar的pom依赖，命中缓存时不打开jar
+
+        Args:
+            jar: jar文件路径
+
+        Returns:
+            同 read_pom
+        """
+        return self._cached(jar, self.read_pom)
+
+
+def default_local_repository() -> Path:
+    """获取Maven本地仓库路径
+
+    优先使用 ~/.m2/settings.xml 中的 <localRepository>，否则为 ~/.m2/repository。
+    """
+    m2_dir = Path.home() / ".m2"
+    settings = m2_dir / "settings.xml"
+    if settings.exists():
+        try:
+            for elem in ET.parse(settings).getroot().iter():
+                if elem.tag.rsplit('}', 1)[-1] == 'localRepository' and elem.text and elem.text.strip():
+                    return Path(os.path.expandvars(elem.text.strip().replace('${user.home}', str(Path.home()))))
+        except ET.ParseError:
+            pass
+    return m2_dir / "repository"
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """内容变化时才写入文件
+
+    Returns:
+        是否写入了文件
+    """
+    data = content.encode('utf-8')
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+class LocalRepoInstaller:
+    """直接写入Maven本地仓库的安装器
+
+    按仓库目录布局写入jar、最小POM、.sha1校验文件、_remote.repositories
+    和 maven-metadata-local.xml，效果等同于 mvn install:install-file
+    （generatePom=true），但无需启动Maven。校验和一致的构件会被跳过。
+    """
+
+    def __init__(self, repo_dir: Path):
+        """初始化安装器
+
+        Args:
+            repo_dir: 本地仓库根目录
+        """
+        self.repo_dir = repo_dir
+
+    def artifact_dir(self, group_id: str, artifact_id: str, version: str = None) -> Path:
+        """获取构件在仓库中的目录"""
+        path = self.repo_dir.joinpath(*group_id.split('.')) / artifact_id
+        return path / version if version else path
+
+    @staticmethod
+    def _pom_content(group_id: str, artifact_id: str, version: str) -> str:
+        """生成最小POM"""
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<project xmlns="http://maven.apache.org/POM/4.0.0" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+            'xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 '
+            'http://maven.apache.org/xsd/maven-4.0.0.xsd">\n'
+            '  <modelVersion>4.0.0</modelVersion>\n'
+            f'  <groupId>{group_id}</groupId>\n'
+            f'  <artifactId>{artifact_id}</artifactId>\n'
+            f'  <version>{version}</version>\n'
+            '  <description>POM was created by lib_manager.py</description>\n'
+            '</project>\n'
+        )
+
+    def install(self, src: Path, group_id: str, artifact_id: str, version: str) -> bool:
+        """安装单个jar
+
+        仓库中的jar与源文件大小、修改时间一致且存在.sha1时直接跳过；
+        否则计算源文件SHA-1，与仓库中的.sha1一致时同样跳过。
+
+        Returns:
+            是否写入了jar（False表示已是最新）
+        """
+        version_dir = self.artifact_dir(group_id, artifact_id, version)
+        base_name = f"{artifact_id}-{version}"
+        jar = version_dir / f"{base_name}.jar"
+        jar_sha1 = version_dir / f"{base_name}.jar.sha1"
+        pom = version_dir / f"{base_name}.pom"
+
+        installed = False
+        src_stat = src.stat()
+        try:
+            jar_stat = jar.stat()
+            same_stat = (jar_stat.st_size == src_stat.st_size
+                         and jar_stat.st_mtime_ns == src_stat.st_mtime_ns)
+            recorded_sha1 = jar_sha1.read_text(encoding='ascii').split()[0] if jar_sha1.exists() else None
+        except (OSError, IndexError):
+            same_stat, recorded_sha1 = False, None
+
+        if not (same_stat and recorded_sha1):
+            sha1 = file_digest(src, 'sha1')
+            if sha1 != recorded_sha1 or not jar.exists():
+                version_dir.mkdir(parents=True, exist_ok=True)
+                copy_file_fast(src, jar)
+                installed = True
+            write_if_changed(jar_sha1, sha1)
+
+        pom_content = self._pom_content(group_id, artifact_id, version)
+        if write_if_changed(pom, pom_content):
+            write_if_changed(version_dir / f"{base_name}.pom.sha1",
+                             hashlib.sha1(pom_content.encode('utf-8')).hexdigest())
+
+        # 与install-file一致，标记为本地安装的构件（仓库ID为空）
+        write_if_changed(version_dir / "_remote.repositories",
+                         "#NOTE: This is a Maven Resolver internal implementation file, "
+                         "its format can be changed without prior notice.\n"
+                         f"{base_name}.jar>=\n{base_name}.pom>=\n")
+        return installed
+
+    def update_metadata(self, group_id: str, artifact_id: str, versions: List[str]) -> bool:
+        """合并版本列表到 maven-metadata-local.xml，已包含所有版本时不改写文件
+
+        Returns:
+            是否写入了文件
+        """
+        metadata = self.artifact_dir(group_id, artifact_id) / "maven-metadata-local.xml"
+        known = []
+        if metadata.exists():
+            try:
+                known = [elem.text for elem in ET.parse(metadata).getroot().iter('version') if elem.text]
+            except ET.ParseError:
+                known = []
+        if known and all(version in known for version in versions):
+            return False
+
+        merged = known + [version for version in versions if version not in known]
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<metadata>',
+                 f'  <groupId>{group_id}</groupId>',
+                 f'  <artifactId>{artifact_id}</artifactId>',
+                 '  <versioning>',
+                 f'    <release>{merged[-1]}</release>',
+                 '    <versions>']
+        lines.extend(f'      <version>{version}</version>' for version in merged)
+        lines.extend(['    </versions>',
+                      f'    <lastUpdated>{datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")}</lastUpdated>',
+                      '  </versioning>', '</metadata>', ''])
+        return write_if_changed(metadata, '\n'.join(lines))
+
+
+class XmlNode:
+    """XML元素及其在原文中的位置
+
+    start/end为整个元素的起止偏移，open_end为开始标签结束处，
+    close_start为结束标签开始处（自闭合元素两者与end相同）。
+    """
+
+    def __init__(self, tag: str, start: int, open_end: int, parent: 'XmlNode' = None):
+        self.tag = tag
+        self.start = start
+        self.open_end = open_end
+        self.close_start = open_end
+        self.end = open_end
+        self.parent = parent
+        self.children = []
+
+    def child(self, tag: str) -> Optional['XmlNode']:
+        """获取第一个指定标签的直接子元素"""
+        for node in self.children:
+            if node.tag == tag:
+                return node
+        return None
+
+    def find_all(self, tag: str) -> List['XmlNode']:
+        """获取所有指定标签的直接子元素"""
+        return [node for node in self.children if node.tag == tag]
+
+    def text(self, source: str) -> str:
+        """获取元素的文本内容（仅适用于叶子元素）"""
+        return source[self.open_end:self.close_start].strip()
+
+    def child_text(self, source: str, tag: str) -> Optional[str]:
+        """获取直接子元素的文本内容"""
+        node = self.child(tag)
+        return node.text(source) if node is not None else None
+
+
+_XML_TOKEN = re.compile(
+    r'<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>|<!DOCTYPE[^>]*>'
+    r'|<(/?)([A-Za-z_][\w.\-:]*)(?:\s[^>]*?)?(/?)>',
+    re.DOTALL)
+
+
+def parse_xml_spans(source: str) -> XmlNode:
+    """解析XML，只记录元素位置，用于在不改变格式和注释的前提下局部修改
+
+    Returns:
+        根元素
+    """
+    root = None
+    stack = []
+    for match in _XML_TOKEN.finditer(source):
+        closing, tag, self_closing = match.group(1), match.group(2), match.group(3)
+        if tag is None:
+            continue
+        if closing:
+            if not stack or stack[-1].tag != tag:
+                raise ValueError(f"XML结构错误: 位置 {match.start()} 处的 </{tag}> 不匹配")
+            node = stack.pop()
+            node.close_start = match.start()
+            node.end = match.end()
+            continue
+
+        parent = stack[-1] if stack else None
+        node = XmlNode(tag, match.start(), match.end(), parent)
+        if parent is not None:
+            parent.children.append(node)
+        elif root is None:
+            root = node
+        if not self_closing:
+            stack.append(node)
+
+    if root is None or stack:
+        raise ValueError("XML结构错误: 缺少根元素或存在未闭合的元素")
+    return root
+
+
+class PomPatcher:
+    """pom.xml局部修改器
+
+    只插入或更新由本工具管理的依赖、install-file执行和profile，
+    保留原文件的格式、缩进、换行符和注释；内容未变化时不写文件。
+    """
+
+    def __init__(self, pom_file: Path):
+        """初始化修改器
+
+        Args:
+            pom_file: pom.xml路径
+        """
+        self.path = pom_file
+        self.original = pom_file.read_bytes()
+        self.source = self.original.decode('utf-8')
+        self.newline = '\r\n' if '\r\n' in self.source else '\n'
+        self.changes = []
+
+    def _root(self) -> XmlNode:
+        """重新解析当前内容，返回project元素"""
+        root = parse_xml_spans(self.source)
+        if root.tag != 'project':
+            raise ValueError(f"不是有效的pom.xml: {self.path}")
+        return root
+
+    def _replace(self, start: int, end: int, text: str, change: str):
+        """替换原文中的一段内容"""
+        self.source = self.source[:start] + text + self.source[end:]
+        self.changes.append(change)
+
+    def _indent_of(self, pos: int) -> str:
+        """获取pos所在行的行首缩进"""
+        line_start = self.source.rfind('\n', 0, pos) + 1
+        prefix = self.source[line_start:pos]
+        return prefix if not prefix.strip() else ''
+
+    def _indent_unit(self, root: XmlNode) -> str:
+        """根据project第一个子元素的缩进推断缩进单位"""
+        if root.children:
+            indent = self._indent_of(root.children[0].start)
+            if indent:
+                return indent
+        return '    '
+
+    def _render(self, lines: List[str], indent: str, unit: str) -> str:
+        """将2空格缩进的片段转换为目标文件的缩进风格"""
+        base = min(len(line) - len(line.lstrip(' ')) for line in lines if line.strip())
+        rendered = []
+        for line in lines:
+            if not line.strip():
+                rendered.append('')
+                continue
+            level = (len(line) - len(line.lstrip(' ')) - base) // 2
+            rendered.append(indent + unit * level + line.strip())
+        return self.newline.join(rendered)
+
+    def _append_child(self, parent: XmlNode, lines: List[str], unit: str, change: str):
+        """在父元素末尾追加子内容
+
+        Args:
+            parent: 父元素
+            lines: 2空格缩进的XML片段
+            unit: 缩进单位
+            change: 修改说明
+        """
+        parent_indent = self._indent_of(parent.start)
+        indent = self._indent_of(parent.children[-1].start) if parent.children else parent_indent + unit
+        block = self._render(lines, indent, unit)
+
+        if parent.open_end == parent.end:
+            # 自闭合元素 <x/> 展开为 <x>...</x>
+            open_tag = self.source[parent.start:parent.end - 2].rstrip() + '>'
+            text = f"{open_tag}{self.newline}{block}{self.newline}{parent_indent}</{parent.tag}>"
+            self._replace(parent.start, parent.end, text, change)
+            return
+
+        close_line_start = self.source.rfind('\n', 0, parent.close_start) + 1
+        if not self.source[close_line_start:parent.close_start].strip() and close_line_start > parent.open_end:
+            self._replace(close_line_start, close_line_start, block + self.newline, change)
+        else:
+            content = self.source[parent.open_end:parent.close_start].rstrip()
+            text = f"{content}{self.newline}{block}{self.newline}{parent_indent}"
+            self._replace(parent.open_end, parent.close_start, text, change)
+
+    def _ensure_path(self, tags: List[str]) -> XmlNode:
+        """确保project下存在指定路径的元素，不存在时逐级创建"""
+        root = self._root()
+        unit = self._indent_unit(root)
+        node = root
+        for tag in tags:
+            child = node.child(tag)
+            if child is None:
+                self._append_child(node, [f"<{tag}>", f"</{tag}>"], unit, f"新增 <{tag}>")
+                return self._ensure_path(tags)
+            node = child
+        return node
+
+    def _set_text(self, node: XmlNode, value: str, change: str):
+        """修改叶子元素的文本"""
+        if node.text(self.source) != value:
+            self._replace(node.open_end, node.close_start, value, change)
+
+    def ensure_dependency(self, dep: Dict, dependency_lines: List[str]):
+        """确保 <dependencies> 中存在该依赖且版本正确
+
+        已有依赖的版本为属性引用（${...}）或由dependencyManagement管理（无version）时不修改。
+
+        Args:
+            dep: 依赖配置
+            dependency_lines: 不存在该依赖时插入的配置
+        """
+        dependencies = self._ensure_path(['dependencies'])
+        for node in dependencies.find_all('dependency'):
+            if (node.child_text(self.source, 'groupId') == dep['group_id']
+                    and node.child_text(self.source, 'artifactId') == dep['artifact_id']):
+                version = node.child('version')
+                if version is not None and not version.text(self.source).startswith('${'):
+                    self._set_text(version, dep['version'],
+                                   f"依赖 {dep['artifact_id']} 版本 -> {dep['version']}")
+                return
+
+        unit = self._indent_unit(self._root())
+        self._append_child(dependencies, dependency_lines, unit, f"新增依赖 {dep['artifact_id']}")
+
+    def ensure_install_execution(self, dep: Dict, plugin_lines: List[str], execution_lines: List[str]):
+        """确保 <build><plugins> 的maven-install-plugin中存在该jar的install-file执行
+
+        Args:
+            dep: 依赖配置
+            plugin_lines: 不存在maven-install-plugin时插入的完整插件配置
+            execution_lines: 插件已存在时插入的execution配置
+        """
+        plugins = self._ensure_path(['build', 'plugins'])
+        unit = self._indent_unit(self._root())
+        plugin = None
+        for node in plugins.find_all('plugin'):
+            if node.child_text(self.source, 'artifactId') == 'maven-install-plugin':
+                plugin = node
+                break
+        if plugin is None:
+            self._append_child(plugins, plugin_lines, unit, f"新增maven-install-plugin ({dep['artifact_id']})")
+            return
+
+        executions = plugin.child('executions')
+        if executions is None:
+            self._append_child(plugin, ["<executions>"] + ["  " + line for line in execution_lines]
+                               + ["</executions>"], unit, f"新增执行 install-{dep['artifact_id']}")
+            return
+
+        execution_id = f"install-{dep['artifact_id']}"
+        for node in executions.find_all('execution'):
+            if node.child_text(self.source, 'id') != execution_id:
+                continue
+            expected = {
+                'file': f"${{project.basedir}}/lib/{dep['jar_file']}",
+                'groupId': dep['group_id'],
+                'artifactId': dep['artifact_id'],
+                'version': dep['version']
+            }
+            # 每次修改后重新解析，按标签逐个更新
+            for tag, value in expected.items():
+                target = self._find_execution_config(execution_id, tag)
+                if target is not None:
+                    self._set_text(target, value, f"执行 {execution_id} 的 {tag} -> {value}")
+            return
+
+        self._append_child(executions, execution_lines, unit, f"新增执行 {execution_id}")
+
+    def _find_execution_config(self, execution_id: str, tag: str) -> Optional[XmlNode]:
+        """在当前内容中查找install执行的configuration子元素"""
+        build = self._root().child('build')
+        plugins = build.child('plugins') if build is not None else None
+        for plugin in plugins.find_all('plugin') if plugins is not None else []:
+            executions = plugin.child('executions')
+            for node in executions.find_all('execution') if executions is not None else []:
+                if node.child_text(self.source, 'id') == execution_id and node.child('configuration') is not None:
+                    return node.child('configuration').child(tag)
+        return None
+
+    def ensure_profile(self, dep: Dict, profile_lines: List[str]):
+        """确保 <profiles> 中存在该jar的按需安装profile，内容不同时整体替换"""
+        profiles = self._ensure_path(['profiles'])
+        unit = self._indent_unit(self._root())
+        profile_id = f"install-{dep['artifact_id']}"
+        # 去掉profile前的说明注释，只替换元素本身
+        element_lines = profile_lines[1:] if profile_lines[0].strip().startswith('<!--') else profile_lines
+
+        def normalize(xml: str) -> str:
+            return re.sub(r'\s+', '', re.sub(r'<!--.*?-->', '', xml, flags=re.DOTALL))
+
+        for node in profiles.find_all('profile'):
+            if node.child_text(self.source, 'id') != profile_id:
+                continue
+            if normalize(self.source[node.start:node.end]) != normalize(''.join(element_lines)):
+                block = self._render(element_lines, self._indent_of(node.start), unit)
+                self._replace(node.start, node.end, block.lstrip(), f"更新profile {profile_id}")
+            return
+
+        self._append_child(profiles, profile_lines, unit, f"新增profile {profile_id}")
+
+    def _remove_node(self, node: XmlNode, change: str):
+        """删除元素；元素独占若干行时连同这些行及紧邻的上一行说明注释一起删除"""
+        start, end = node.start, node.end
+        line_start = self.source.rfind('\n', 0, start) + 1
+        line_end = self.source.find('\n', end)
+        if self.source[line_start:start].strip() or (line_end != -1 and self.source[end:line_end].strip()):
+            self._replace(start, end, '', change)
+            return
+
+        start = line_start
+        end = line_end + 1 if line_end != -1 else len(self.source)
+        if start > 0:
+            prev_start = self.source.rfind('\n', 0, start - 1) + 1
+            prev_line = self.source[prev_start:start].strip()
+            if prev_line.startswith('<!--') and prev_line.endswith('-->') and prev_line.count('<!--') == 1:
+                start = prev_start
+        # 删除的是父元素中最后的内容时，去掉前面留下的空行
+        if self.source[end:].lstrip(' \t').startswith('</') and start > 0:
+            prev_start = self.source.rfind('\n', 0, start - 1) + 1
+            if not self.source[prev_start:start].strip():
+                start = prev_start
+        self._replace(start, end, '', change)
+
+    def _is_empty(self, node: XmlNode) -> bool:
+        """元素没有子元素、文本和注释"""
+        return not node.children and not self.source[node.open_end:node.close_start].strip()
+
+    def _remove_empty_path(self, tags: List[str]):
+        """从最深层开始依次删除project下该路径上已变空的元素"""
+        for depth in range(len(tags), 0, -1):
+            node = self._root()
+            for tag in tags[:depth]:
+                node = node.child(tag) if node is not None else None
+            if node is None or not self._is_empty(node):
+                return
+            self._remove_node(node, f"移除空的 <{node.tag}>")
+
+    def remove_install_execution(self, dep: Dict):
+        """删除 <build><plugins> 中该jar的install-file执行（切换到profile/local-repo方式时）
+
+        maven-install-plugin没有其他执行时一并删除；插件还有其他配置时只删除空的 <executions>。
+        """
+        execution_id = f"install-{dep['artifact_id']}"
+        build = self._root().child('build')
+        plugins = build.child('plugins') if build is not None else None
+        for plugin in plugins.find_all('plugin') if plugins is not None else []:
+            if plugin.child_text(self.source, 'artifactId') != 'maven-install-plugin':
+                continue
+            executions = plugin.child('executions')
+            for node in executions.find_all('execution') if executions is not None else []:
+                if node.child_text(self.source, 'id') != execution_id:
+                    continue
+                self._remove_node(node, f"移除执行 {execution_id}")
+                self._remove_empty_install_plugin()
+                self._remove_empty_path(['build', 'plugins'])
+                return
+
+    def _remove_empty_install_plugin(self):
+        """删除已没有执行的maven-install-plugin"""
+        plugins = self._root().child('build').child('plugins')
+        for plugin in plugins.find_all('plugin'):
+            if plugin.child_text(self.source, 'artifactId') != 'maven-install-plugin':
+                continue
+            executions = plugin.child('executions')
+            if executions is None or not self._is_empty(executions):
+                continue
+            if {node.tag for node in plugin.children} <= {'groupId', 'artifactId', 'version', 'executions'}:
+                self._remove_node(plugin, "移除maven-install-plugin")
+            else:
+                self._remove_node(executions, "移除空的 <executions>")
+            return
+
+    def remove_profile(self, dep: Dict):
+        """删除 <profiles> 中该jar的按需安装profile（切换到其他安装方式时）"""
+        profile_id = f"install-{dep['artifact_id']}"
+        profiles = self._root().child('profiles')
+        for node in profiles.find_all('profile') if profiles is not None else []:
+            if node.child_text(self.source, 'id') == profile_id:
+                self._remove_node(node, f"移除profile {profile_id}")
+                self._remove_empty_path(['profiles'])
+                return
+
+    def save(self) -> bool:
+        """内容变化时写回文件
+
+        Returns:
+            是否写入了文件
+        """
+        data = self.source.encode('utf-8')
+        if data == self.original:
+            return False
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self.path)
+        self.original = data
+        return True
+
+
+class PlanAction:
+    """操作计划中的单个操作"""
+
+    def __init__(self, action_id: int, kind: str, target: Path, func, size: int = 0,
+                 deps: List['PlanAction'] = None, detail: str = '', phase: str = None):
+        """初始化操作
+
+        Args:
+            action_id: 操作编号
+            kind: 操作类型，mkdir/copy/link/write
+            target: 操作目标路径
+            func: 执行函数（mkdir操作为None，由执行器批量创建）
+            size: 预计写入的字节数
+            deps: 依赖的操作
+            detail: 附加说明
+            phase: 操作所属的步骤（setup/copy/generate/readme/prune），用于运行剖析
+        """
+        self.id = action_id
+        self.kind = kind
+        self.target = target
+        self.func = func
+        self.size = size
+        self.deps = deps or []
+        self.detail = detail
+        self.phase = phase
+
+
+class OperationPlan:
+    """操作计划
+
+    由mkdir/copy/link/write操作组成的有向无环图。执行时先批量创建所有目录，
+    再按依赖关系并行执行其余操作；某个操作失败时，依赖它的操作不会执行。
+    新添加的操作记录当前的 phase（所属步骤）。
+    """
+
+    def __init__(self):
+        self.actions = []
+        self.finalizers = []
+        self.phase = None
+        self._dirs = {}
+
+    def mkdir(self, path: Path) -> PlanAction:
+        """添加创建目录操作，同一目录只添加一次"""
+        action = self._dirs.get(path)
+        if action is None:
+            action = self.add('mkdir', path, None)
+            self._dirs[path] = action
+        return action
+
+    def add(self, kind: str, target: Path, func, size: int = 0,
+            deps: List[PlanAction] = None, detail: str = '') -> PlanAction:
+        """添加操作
+
+        Returns:
+            新添加的操作
+        """
+        action = PlanAction(len(self.actions) + 1, kind, target, func, size, deps, detail, self.phase)
+        self.actions.append(action)
+        return action
+
+    def add_finalizer(self, func):
+        """添加所有操作完成后执行的收尾函数（如保存清单）"""
+        self.finalizers.append(func)
+
+    def merge(self, other: 'OperationPlan'):
+        """把另一个计划的操作和收尾函数追加到本计划，操作重新编号
+
+        两个计划创建同一目录时只保留本计划中的mkdir操作，依赖它的操作改为依赖该操作。
+        """
+        replaced = {}
+        for path, action in other._dirs.items():
+            if path in self._dirs:
+                replaced[id(action)] = self._dirs[path]
+        for action in other.actions:
+            if id(action) in replaced:
+                continue
+            action.deps = [replaced.get(id(dep), dep) for dep in action.deps]
+            action.id = len(self.actions) + 1
+            self.actions.append(action)
+            if action.kind == 'mkdir':
+                self._dirs[action.target] = action
+        self.finalizers.extend(other.finalizers)
+
+    def print_plan(self):
+        """打印操作计划"""
+        print("\n=== 操作计划 ===")
+        counts = {}
+        for action in self.actions:
+            counts[action.kind] = counts.get(action.kind, 0) + 1
+            line = f"  #{action.id:<5} {action.kind:<6} {action.target}"
+            if action.size:
+                line += f"  {format_size(action.size)}"
+            if action.detail:
+                line += f"  {action.detail}"
+            if action.deps:
+                line += f"  (依赖 {', '.join(f'#{dep.id}' for dep in action.deps)})"
+            print(line)
+
+        total = sum(action.size for action in self.actions)
+        kinds = ", ".join(f"{kind} {count}" for kind, count in counts.items())
+        print(f"共 {len(self.actions)} 个操作: {kinds or '无'}；预计写入 {format_size(total)}\n")
+
+    def execute(self, workers: int, profiler: 'RunProfiler' = None):
+        """执行操作计划
+
+        Args:
+            workers: 并行线程数
+            profiler: 运行剖析器，启用时按步骤记录墙钟时间（该步骤第一个操作开始到最后一个操作结束）
+
+        Raises:
+            第一个失败操作的异常
+        """
+        timings = {}
+        timings_lock = threading.Lock()
+
+        def timed(action: PlanAction, func):
+            started = time.perf_counter()
+            try:
+                func()
+            finally:
+                finished = time.perf_counter()
+                with timings_lock:
+                    timing = timings.setdefault(action.phase, [started, finished, 0.0, 0])
+                    timing[0] = min(timing[0], started)
+                    timing[1] = max(timing[1], finished)
+                    timing[2] += finished - started
+                    timing[3] += 1
+
+        def runner(action: PlanAction, func=None):
+            """操作的执行函数，启用剖析时包装为计时版本"""
+            func = func or action.func
+            return partial(timed, action, func) if profiler is not None and profiler.enabled else func
+
+        for path in sorted(self._dirs):
+            runner(self._dirs[path], partial(path.mkdir, parents=True, exist_ok=True))()
+        if self._dirs:
+            print(f"[OK] 创建目录: {len(self._dirs)} 个")
+
+        done = {action.id for action in self._dirs.values()}
+        remaining = {}
+        dependents = {}
+        ready = []
+        for action in self.actions:
+            if action.kind == 'mkdir':
+                continue
+            pending_deps = [dep for dep in action.deps if dep.id not in done]
+            remaining[action.id] = len(pending_deps)
+            for dep in pending_deps:
+                dependents.setdefault(dep.id, []).append(action)
+            if not pending_deps:
+                ready.append(action)
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            running = {executor.submit(runner(action)): action for action in ready}
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    action = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    for child in dependents.get(action.id, []):
+                        remaining[child.id] -= 1
+                        if remaining[child.id] == 0:
+                            running[executor.submit(runner(child))] = child
+
+        for finalizer in self.finalizers:
+            finalizer()
+
+        for phase, (started, finished, busy, count) in sorted(timings.items(), key=lambda item: item[1][0]):
+            profiler.record_phase(phase or 'other', finished - started, actions=count, busy_seconds=busy)
+
+        if errors:
+            raise errors[0]
+
+
+class RunProfiler:
+    """运行剖析器
+
+    记录每个步骤的耗时，以及每个文件操作的耗时、读写字节数和所属源目录，
+    汇总为按操作类型、按源目录的统计和最慢的N个文件操作。线程安全。
+    未启用时只保留空操作，不产生额外开销。
+    """
+
+    def __init__(self, enabled: bool = True, top_n: int = DEFAULT_PROFILE_TOP):
+        """初始化剖析器
+
+        Args:
+            enabled: 是否启用
+            top_n: 记录的最慢文件操作数量
+        """
+        self.enabled = enabled
+        self.top_n = top_n
+        self.started = time.perf_counter()
+        self.phases = []
+        self.operations = {}
+        self.roots = {}
+        self.slowest = []
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """记录一个步骤的墙钟时间"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.phases.append({'name': name, 'seconds': time.perf_counter() - started})
+
+    def record_phase(self, name: str, seconds: float, **extra):
+        """记录在操作计划中与其他步骤交错执行的步骤（见 OperationPlan.execute）
+
+        Args:
+            name: 步骤名称
+            seconds: 墙钟时间
+            extra: 附加信息，如操作数、各操作耗时之和
+        """
+        if self.enabled:
+            with self._lock:
+                self.phases.append(dict({'name': name, 'seconds': seconds}, **extra))
+
+    def record(self, kind: str, path: Path, seconds: float, bytes_read: int = 0,
+               bytes_written: int = 0, root: Path = None):
+        """记录一次文件操作
+
+        Args:
+            kind: 操作类型，如 copy/link/skip/write
+            path: 目标文件
+            seconds: 耗时
+            bytes_read: 读取的字节数
+            bytes_written: 写入的字节数
+            root: 源文件所在的源目录（没有源文件的操作为None）
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.operations.setdefault(kind, {'count': 0, 'seconds': 0.0,
+                                                      'bytes_read': 0, 'bytes_written': 0})
+            stats['count'] += 1
+            stats['seconds'] += seconds
+            stats['bytes_read'] += bytes_read
+            stats['bytes_written'] += bytes_written
+            if root is not None:
+                root_stats = self.roots.setdefault(str(root), {'files': 0, 'seconds': 0.0, 'bytes_read': 0})
+                root_stats['files'] += 1
+                root_stats['seconds'] += seconds
+                root_stats['bytes_read'] += bytes_read
+
+            self._counter += 1
+            entry = (seconds, self._counter, {
+                'kind': kind, 'path': str(path), 'seconds': seconds, 'bytes_read': bytes_read,
+                'bytes_written': bytes_written, 'root': str(root) if root is not None else None
+            })
+            if len(self.slowest) < self.top_n:
+                heapq.heappush(self.slowest, entry)
+            elif self.top_n > 0:
+                heapq.heappushpop(self.slowest, entry)
+
+    def report(self) -> Dict:
+        """生成剖析报告"""
+        roots = []
+        for root, stats in sorted(self.roots.items()):
+            throughput = stats['bytes_read'] / stats['seconds'] if stats['seconds'] > 0 else 0
+            roots.append(dict(stats, root=root, throughput=throughput))
+        operations = self.operations.values()
+        return {
+            'version': 1,
+            'command': sys.argv[1:],
+            'total_seconds': time.perf_counter() - self.started,
+            'phases': self.phases,
+            'totals': {
+                'files': sum(stats['count'] for stats in operations),
+                'bytes_read': sum(stats['bytes_read'] for stats in operations),
+                'bytes_written': sum(stats['bytes_written'] for stats in operations)
+            },
+            'operations': self.operations,
+            'roots': roots,
+            'slowest': [entry for _, _, entry in sorted(self.slowest, key=lambda item: item[:2], reverse=True)]
+        }
+
+    def write(self, output_file: Path) -> Dict:
+        """写入JSON报告并打印摘要表
+
+        Returns:
+            剖析报告
+        """
+        report = self.report()
+        write_if_changed(output_file, json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+
+        totals = report['totals']
+        print(f"\n=== 运行剖析（总耗时 {report['total_seconds']:.3f}s） ===")
+        for phase in report['phases']:
+            print(f"  步骤   {phase['name']:<24} {phase['seconds'] * 1000:10.1f}ms")
+        for kind, stats in sorted(report['operations'].items()):
+            print(f"  操作   {kind:<24} {stats['count']:6d} 个 {stats['seconds'] * 1000:10.1f}ms  "
+                  f"读 {format_size(stats['bytes_read'])}, 写 {format_size(stats['bytes_written'])}")
+        for root in report['roots']:
+            print(f"  源目录 {root['root']}: {root['files']} 个, 读 {format_size(root['bytes_read'])}, "
+                  f"{format_size(int(root['throughput']))}/s")
+        for entry in report['slowest']:
+            print(f"  最慢   {entry['kind']:<9} {entry['seconds'] * 1000:8.1f}ms  {entry['path']}")
+        print(f"共 {totals['files']} 个文件操作，读 {format_size(totals['bytes_read'])}，"
+              f"写 {format_size(totals['bytes_written'])}")
+        print(f"[OK] 剖析结果已写入: {output_file}\n")
+        return report
+
+
 class LibManager:
     """本地库管理器"""
 
-    def __init__(self, config_file: str):
+    def __init__(self, config_file: str, incremental: bool = False, workers: int = None,
+                 link_mode: str = 'copy', pom_install: str = 'plugin', local_repo: str = None,
+                 profiler: RunProfiler = None):
         """初始化管理器
 
         Args:
             config_file: 配置文件路径
+            incremental: 是否启用增量同步（跳过未变化的jar）
+            workers: 并行复制线程数，默认 min(32, CPU数+4)
+            link_mode: jar同步方式，copy/hardlink/symlink
+            pom_install: 生成的POM配置中本地jar的安装方式，见 POM_INSTALL_MODES
+            local_repo: Maven本地仓库路径，默认读取settings.xml或使用~/.m2/repository
+            profiler: 运行剖析器，默认不记录
         """
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"不支持的链接模式: {link_mode}")
+        if pom_install not in POM_INSTALL_MODES:
+            raise ValueError(f"不支持的安装方式: {pom_install}")
         self.config_file = Path(config_file)
         self.base_dir = self.config_file.parent
+        self.cache_dir = self.base_dir / CACHE_DIR
+        self._resolved_paths = {}
         self.config = self._load_config()
+        self.incremental = incremental
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.link_mode = link_mode
+        self.pom_install = pom_install
+        self.local_repo = local_repo
+        self.jar_store = None
+        self.jar_index = None
+        self.jar_inspector = None
+        self.hash_cache = None
+        self._stats_lock = threading.Lock()
+        self.copy_stats = self._new_copy_stats()
+        self.profiler = profiler or RunProfiler(enabled=False)
 
     def _load_config(self) -> Dict:
-        """加载配置文件"""
+        """加载配置文件
+
+        优先读取 .lib-cache 中的编译缓存（解析后的配置和预先解析的路径）：
+        配置文件大小和修改时间未变时直接加载缓存，不读取YAML；修改时间变化但
+        内容SHA-256未变时同样复用缓存。否则重新解析并更新缓存。
+        """
         if not self.config_file.exists():
             raise FileNotFoundError(f"配置文件不存在: {self.config_file}")
 
-        with open(self.config_file, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        stat = self.config_file.stat()
+        snapshot_file = self.cache_dir / f"config-{self.config_file.name}.json"
+        snapshot = self._read_config_snapshot(snapshot_file)
+        self._pattern_modules = {}
+        if snapshot is not None and snapshot['stat'] == [stat.st_size, stat.st_mtime_ns]:
+            self._resolved_paths = {path: Path(value) for path, value in snapshot['paths'].items()}
+            return self._apply_dependency_sets(snapshot['config'])
+
+        content = self.config_file.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        if snapshot is not None and snapshot['sha256'] == digest:
+            config = snapshot['config']
+            self._resolved_paths = {path: Path(value) for path, value in snapshot['paths'].items()}
+        else:
+            config = yaml.load(content.decode('utf-8'), Loader=YAML_LOADER)
+            self._resolved_paths = {}
+            self._precompute_paths(config)
+
+        self._write_config_snapshot(snapshot_file, {
+            'version': CONFIG_SNAPSHOT_VERSION,
+            'base_dir': str(self.base_dir.resolve()),
+            'stat': [stat.st_size, stat.st_mtime_ns],
+            'sha256': digest,
+            'config': config,
+            'paths': {path: str(value) for path, value in self._resolved_paths.items()}
+        })
+        return self._apply_dependency_sets(config)
 
+    @staticmethod
+    def _apply_dependency_sets(config: Dict) -> Dict:
+        """展开公共模块、子项目和模块模式中引用的依赖集合
+
+        集合中的依赖排在前面，模块自身的依赖在后，同名jar以模块自身的声明为准。
+        同一集合的依赖字典被所有引用它的模块共享，不会为每个模块复制。
+
+        Returns:
+            展开后的配置（原地修改）
+        """
+        dependency_sets = config.get('dependency_sets') or {}
+        sections = ([config.get('common')] + list(config.get('modules') or [])
+                    + list(config.get('module_patterns') or []))
+        for section in sections:
+            if not section or not section.get('dependency_sets'):
+                continue
+            merged = {}
+            for name in section['dependency_sets']:
+                if name not in dependency_sets:
+                    raise ValueError(f"未定义的依赖集合: {name}")
+                for dep in dependency_sets[name] or []:
+                    merged[dep['jar_file']] = dep
+            for dep in section.get('dependencies') or []:
+                merged.pop(dep['jar_file'], None)
+                merged[dep['jar_file']] = dep
+            section['dependencies'] = list(merged.values())
         return config
 
+    def _read_config_snapshot(self, snapshot_file: Path) -> Optional[Dict]:
+        """读取配置编译缓存（JSON），格式版本或项目位置不一致时视为无缓存"""
+        try:
+            with open(snapshot_file, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(snapshot, dict)
+                or snapshot.get('version') != CONFIG_SNAPSHOT_VERSION
+                or snapshot.get('base_dir') != str(self.base_dir.resolve())):
+            return None
+        return snapshot
+
+    def _write_config_snapshot(self, snapshot_file: Path, snapshot: Dict):
+        """写入配置编译缓存，写入失败不影响正常运行
+
+        只保存JSON数据，读取缓存不会执行任何代码；配置中含有JSON无法表示的值
+        （如YAML日期）时不写缓存。
+        """
+        try:
+            data = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':'))
+        except (TypeError, ValueError):
+            return
+        try:
+            snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = snapshot_file.with_name(f"{snapshot_file.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, snapshot_file)
+        except OSError as e:
+            print(f"[WARN] 无法写入配置缓存: {e}")
+
+    def _precompute_paths(self, config: Dict):
+        """预先解析配置中所有lib_dir、pom_file和jar源目录路径"""
+        sections = [config.get('common')] + list(config.get('modules') or [])
+        for section in sections:
+            if not section:
+                continue
+            for key in ('lib_dir', 'pom_file'):
+                if section.get(key):
+                    self._resolve_path(section[key])
+        jar_sources = config.get('jar_sources') or {}
+        for path in [jar_sources.get('base_dir')] + list(jar_sources.get('additional_dirs') or []):
+            if path:
+                self._resolve_path(path)
+
     def _resolve_path(self, path: str) -> Path:
-        """解析相对路径为绝对路径
+        """解析相对路径为绝对路径，结果会被缓存
 
         Args:
             path: 相对路径
@@ -53,10 +1973,615 @@ class LibManager:
         Returns:
             绝对路径
         """
-        rel_path = Path(path)
-        if rel_path.is_absolute():
-            return rel_path
-        return (self.base_dir / rel_path).resolve()
+        resolved = self._resolved_paths.get(path)
+        if resolved is None:
+            rel_path = Path(path)
+            resolved = rel_path if rel_path.is_absolute() else (self.base_dir / rel_path).resolve()
+            self._resolved_paths[path] = resolved
+        return resolved
+
+    def _jar_roots(self) -> List[Path]:
+        """获取所有jar源目录，按优先级从高到低排列"""
+        jar_sources = self.config['jar_sources']
+        roots = [self._resolve_path(jar_sources['base_dir'])]
+        for extra in jar_sources.get('additional_dirs') or []:
+            root = self._resolve_path(extra)
+            if root not in roots:
+                roots.append(root)
+        return roots
+
+    def _get_jar_index(self) -> JarIndex:
+        """获取jar索引，首次调用时加载（缓存按目录修改时间校验）并打印摘要，之后直接复用
+
+        监视模式在每轮轮询时自行调用 JarIndex.refresh()。
+        """
+        if self.jar_index is not None:
+            return self.jar_index
+        roots = self._jar_roots()
+        precedence = self.config['jar_sources'].get('precedence', 'first')
+        self.jar_index = JarIndex(roots, self.cache_dir / INDEX_CACHE_FILE, precedence)
+
+        index = self.jar_index
+        state = f"重新扫描 {len(index.rescanned)} 个" if index.rescanned else "缓存有效"
+        print(f"[OK] jar索引: {len(index)} 个jar, {len(index.roots)} 个源目录 ({state})")
+        for name, paths in sorted(index.shadowed().items()):
+            print(f"  [WARN] {name} 存在于多个源目录，按 {index.precedence} 规则使用: {index.resolve(name)}")
+        return index
+
+    def _iter_dependencies(self):
+        """遍历公共模块和所有子项目的依赖
+
+        Yields:
+            (模块名称, 依赖配置)
+        """
+        for module_config, module_name in self._iter_module_configs():
+            for dep in module_config.get('dependencies') or []:
+                yield module_name, dep
+
+    def _get_hash_cache(self) -> HashCache:
+        """获取jar哈希缓存（jar检查、去重存储等共用一个）"""
+        if self.hash_cache is None:
+            self.hash_cache = HashCache(self.cache_dir / HASH_CACHE_FILE)
+        return self.hash_cache
+
+    def _get_jar_inspector(self) -> JarInspector:
+        """获取jar元数据检查器"""
+        if self.jar_inspector is None:
+            self.jar_inspector = JarInspector(self._get_hash_cache(), self.cache_dir / GAV_CACHE_FILE)
+        return self.jar_inspector
+
+    def _save_inspector_cache(self):
+        """保存检查结果和哈希缓存"""
+        if self.jar_inspector is not None:
+            self.jar_inspector.save()
+            self.jar_inspector.hash_cache.save()
+
+    def _complete_dependencies(self):
+        """为缺少 group_id/artifact_id/version 的依赖从jar元数据中补全坐标"""
+        # 依赖集合中的依赖被多个模块共享，只需补全一次
+        incomplete = {}
+        for name, dep in self._iter_dependencies():
+            if id(dep) not in incomplete and any(not dep.get(key) for key in GAV_KEYS):
+                incomplete[id(dep)] = (name, dep)
+        incomplete = list(incomplete.values())
+        if not incomplete:
+            return
+
+        jar_index = self._get_jar_index()
+        inspector = self._get_jar_inspector()
+        for module_name, dep in incomplete:
+            jar = jar_index.resolve(dep['jar_file'])
+            gav = inspector.inspect(jar) if jar is not None else {}
+            for key in GAV_KEYS:
+                if not dep.get(key) and gav.get(key):
+                    dep[key] = gav[key]
+            missing = [key for key in GAV_KEYS if not dep.get(key)]
+            if missing:
+                raise ValueError(f"[{module_name}] 无法从 {dep['jar_file']} 中读取坐标，"
+                                 f"请在配置中填写: {', '.join(missing)}")
+            print(f"  [OK] [{module_name}] 自动识别坐标: {dep['jar_file']} -> "
+                  f"{dep['group_id']}:{dep['artifact_id']}:{dep['version']}")
+        self._save_inspector_cache()
+
+    def inspect_jars(self) -> int:
+        """并行检查所有源目录中的jar，并校验配置中的GAV坐标
+
+        Returns:
+            问题数（坐标不一致、jar缺失或损坏）
+        """
+        print("\n=== 检查JAR元数据 ===")
+        jar_index = self._get_jar_index()
+        inspector = self._get_jar_inspector()
+
+        names = sorted(jar_index.names())
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = dict(zip(names, executor.map(lambda name: inspector.inspect(jar_index.resolve(name)), names)))
+        self._save_inspector_cache()
+
+        configured = {}
+        for module_name, dep in self._iter_dependencies():
+            configured.setdefault(dep['jar_file'], []).append((module_name, dep))
+
+        problems = 0
+        for name in names:
+            gav = results[name]
+            if 'error' in gav:
+                problems += 1
+                print(f"  [ERR] {name}: 无法读取 ({gav['error']})")
+                continue
+            coords = f"{gav['group_id']}:{gav['artifact_id']}:{gav['version']}" if gav else "无Maven元数据"
+            if name not in configured:
+                print(f"  [--] {name}: {coords} (未配置)")
+                continue
+            for module_name, dep in configured[name]:
+                diffs = [f"{key}={dep.get(key)!r}/jar={gav[key]!r}" for key in GAV_KEYS
+                         if gav and dep.get(key) and dep.get(key) != gav[key]]
+                if diffs:
+                    problems += 1
+                    print(f"  [WARN] [{module_name}] {name}: 坐标与jar元数据不一致 ({', '.join(diffs)})")
+                else:
+                    print(f"  [OK] [{module_name}] {name}: {coords}")
+
+        for name, deps in sorted(configured.items()):
+            if jar_index.resolve(name) is None:
+                problems += len(deps)
+                print(f"  [ERR] {name}: 源目录中不存在")
+
+        print(f"共检查 {len(names)} 个jar，发现 {problems} 个问题\n")
+        return problems
+
+    def check_conflicts(self) -> int:
+        """检查每个模块实际classpath（公共模块 + 模块自身依赖）中的冲突
+
+        并行读取所有jar的类列表，报告：
+        - 同一构件（groupId:artifactId）的多个版本
+        - 重复类：同一个类出现在多个jar中
+        - 拆分包：同一个包的不同类分布在多个jar中
+
+        公共模块内部的冲突只在公共模块中报告一次，子项目只报告涉及自身依赖的冲突。
+
+        Returns:
+            问题数
+        """
+        print("\n=== 检查类冲突 ===")
+        self._complete_dependencies()
+        class_index = ClassIndex(self._get_jar_inspector().hash_cache, self.cache_dir / CLASS_INDEX_FILE)
+        classpaths, problems = self._module_classpaths()
+
+        jars = sorted({jar for _, _, entries in classpaths for _, _, jar in entries})
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = dict(zip(jars, executor.map(class_index.classes, jars)))
+        class_index.save()
+        self._save_inspector_cache()
+
+        base = self._new_classpath_scan()
+        for module_config, module_name, entries in classpaths:
+            scan = self._classpath_conflicts(module_name, entries, results, base)
+            problems += scan['problems']
+            if module_config is self.config.get('common'):
+                base = scan
+
+        print(f"共检查 {len(jars)} 个jar，发现 {problems} 个问题\n")
+        return problems
+
+    def _module_classpaths(self) -> Tuple[List[Tuple], int]:
+        """收集每个模块classpath中的jar（优先使用lib目录中的jar，不存在时使用源jar）
+
+        Returns:
+            ([(模块配置, 模块名, [(显示名, 依赖配置, jar路径), ...]), ...], 缺失的jar数)
+        """
+        jar_index = self._get_jar_index()
+        missing = 0
+        classpaths = []
+        for module_config, module_name in self._iter_module_configs():
+            lib_dir = self._resolve_path(module_config['lib_dir'])
+            entries = []
+            for dep in module_config.get('dependencies') or []:
+                jar = lib_dir / dep['jar_file']
+                if not jar.exists():
+                    jar = jar_index.resolve(dep['jar_file'])
+                if jar is None:
+                    missing += 1
+                    print(f"  [ERR] [{module_name}] {dep['jar_file']}: lib目录和源目录中都不存在")
+                    continue
+                entries.append((f"{module_name}/{dep['jar_file']}", dep, jar))
+            classpaths.append((module_config, module_name, entries))
+        return classpaths, missing
+
+    @staticmethod
+    def _new_classpath_scan() -> Dict:
+        """创建空的classpath扫描结果"""
+        return {'problems': 0, 'classes': {}, 'packages': {}, 'artifacts': {}}
+
+    def _classpath_conflicts(self, module_name: str, entries: List[Tuple], results: Dict, base: Dict) -> Dict:
+        """检查一个classpath中的冲突
+
+        Args:
+            module_name: 模块名称（用于显示）
+            entries: [(显示名, 依赖配置, jar路径), ...]
+            results: jar路径 -> ClassIndex.classes 结果
+            base: 位于classpath前部的公共模块扫描结果，只报告至少涉及一个entries中jar的冲突
+
+        Returns:
+            扫描结果：问题数，以及合并了base的 类/包/构件 -> jar显示名 映射
+        """
+        scan = self._new_classpath_scan()
+        class_owners = {}
+        artifacts = {}
+        for label, dep, jar in entries:
+            result = results[jar]
+            if 'error' in result:
+                scan['problems'] += 1
+                print(f"  [ERR] [{module_name}] {label}: 无法读取 ({result['error']})")
+                continue
+            artifacts.setdefault((dep['group_id'], dep['artifact_id']), []).append((dep['version'], label))
+            for class_name in result['classes']:
+                class_owners.setdefault(class_name, []).append(label)
+
+        for key, versions in sorted(artifacts.items()):
+            versions = base['artifacts'].get(key, []) + versions
+            if len({version for version, _ in versions}) > 1:
+                scan['problems'] += 1
+                listed = ", ".join(f"{version} ({label})" for version, label in versions)
+                print(f"  [WARN] [{module_name}] 同一构件存在多个版本: {key[0]}:{key[1]} -> {listed}")
+
+        duplicates = {}
+        package_owners = {}
+        for class_name, owners in class_owners.items():
+            owners = base['classes'].get(class_name, []) + owners
+            if len(owners) > 1:
+                duplicates.setdefault(tuple(owners), []).append(class_name)
+            package = class_name.rpartition('.')[0]
+            package_owners.setdefault(package, set(base['packages'].get(package, ()))).update(owners)
+
+        for owners, class_names in sorted(duplicates.items()):
+            scan['problems'] += 1
+            print(f"  [WARN] [{module_name}] 重复类 {len(class_names)} 个: {', '.join(owners)} "
+                  f"(如 {min(class_names)})")
+
+        # 已作为重复类报告的jar组合（如同一库的两个版本）不再重复报告拆分包
+        splits = {}
+        for package, owners in package_owners.items():
+            if len(owners) > 1 and not any(owners <= set(dup) for dup in duplicates):
+                splits.setdefault(tuple(sorted(owners)), []).append(package)
+        for owners, packages in sorted(splits.items()):
+            scan['problems'] += 1
+            print(f"  [WARN] [{module_name}] 拆分包 {len(packages)} 个: {', '.join(owners)} "
+                  f"(如 {min(packages)})")
+
+        if scan['problems'] == 0:
+            print(f"  [OK] [{module_name}] 未发现冲突 ({len(entries)} 个jar)")
+
+        scan['classes'] = dict(base['classes'])
+        for class_name, owners in class_owners.items():
+            scan['classes'][class_name] = base['classes'].get(class_name, []) + owners
+        scan['packages'] = dict(base['packages'])
+        scan['packages'].update(package_owners)
+        scan['artifacts'] = dict(base['artifacts'])
+        for key, versions in artifacts.items():
+            scan['artifacts'][key] = base['artifacts'].get(key, []) + versions
+        return scan
+
+    def check_dependencies(self) -> int:
+        """检查每个模块classpath中jar的传递依赖
+
+        并行读取jar内嵌的pom.xml，在公共模块和各模块的jar之间建立依赖图，
+        沿依赖图报告既不在本地lib中、也未由模块pom.xml（及其父POM）声明或管理、
+        也不在Maven本地仓库中的依赖——这些依赖在离线构建或运行时会缺失。
+
+        公共模块jar的问题只在公共模块中报告一次。
+
+        Returns:
+            问题数
+        """
+        print("\n=== 检查传递依赖 ===")
+        self._complete_dependencies()
+        reader = EmbeddedPomReader(self._get_hash_cache(), self.cache_dir / POM_CACHE_FILE)
+        repo = LocalRepoInstaller(Path(self.local_repo) if self.local_repo else default_local_repository())
+        classpaths, problems = self._module_classpaths()
+
+        jars = sorted({jar for _, _, entries in classpaths for _, _, jar in entries})
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = dict(zip(jars, executor.map(reader.read, jars)))
+        reader.save()
+        self._get_hash_cache().save()
+
+        pom_cache = {}
+        base_local = {}
+        base_managed = set()
+        for module_config, module_name, entries in classpaths:
+            local = dict(base_local)
+            for label, dep, jar in entries:
+                local[(dep['group_id'], dep['artifact_id'])] = (dep['version'], label, jar)
+            managed = base_managed | self._pom_managed_artifacts(self._module_pom_file(module_config), pom_cache)
+            problems += self._classpath_dependencies(module_name, entries, local, managed, results, repo)
+            if module_config is self.config.get('common'):
+                base_local, base_managed = local, managed
+
+        print(f"共检查 {len(jars)} 个jar，发现 {problems} 个问题\n")
+        return problems
+
+    def _pom_managed_artifacts(self, pom_file: Path, cache: Dict) -> set:
+        """读取pom.xml及其本地父POM中声明或管理（dependencyManagement）的构件
+
+        Returns:
+            {(groupId, artifactId), ...}
+        """
+        if pom_file in cache:
+            return cache[pom_file]
+        cache[pom_file] = set()
+        try:
+            root = parse_pom(pom_file)
+        except (OSError, ET.ParseError):
+            return cache[pom_file]
+
+        managed = {(dep['group_id'], dep['artifact_id'])
+                   for path in ('dependencies', 'dependencyManagement/dependencies')
+                   for dep in pom_dependencies(root, path)}
+        if root.find('parent') is not None:
+            relative_path = root.findtext('parent/relativePath')
+            relative_path = '../pom.xml' if relative_path is None else relative_path.strip()
+            if relative_path:
+                parent_file = pom_file.parent / relative_path
+                if parent_file.is_dir():
+                    parent_file = parent_file / "pom.xml"
+                managed |= self._pom_managed_artifacts(parent_file.resolve(), cache)
+        cache[pom_file] = managed
+        return managed
+
+    def _classpath_dependencies(self, module_name: str, entries: List[Tuple], local: Dict, managed: set,
+                                results: Dict, repo: LocalRepoInstaller) -> int:
+        """沿依赖图检查一个模块自身jar的传递依赖
+
+        Args:
+            module_name: 模块名称（用于显示）
+            entries: [(显示名, 依赖配置, jar路径), ...]
+            local: 该模块classpath中的jar，(groupId, artifactId) -> (版本, 显示名, jar路径)
+            managed: pom.xml中声明或管理的 (groupId, artifactId)
+            results: jar路径 -> EmbeddedPomReader.read 结果
+            repo: Maven本地仓库
+
+        Returns:
+            问题数
+        """
+        problems = 0
+        checked = 0
+        unresolved = {}
+        without_pom = []
+        for label, dep, jar in entries:
+            result = results[jar]
+            if 'error' in result:
+                problems += 1
+                print(f"  [ERR] [{module_name}] {label}: 无法读取pom.xml ({result['error']})")
+            elif not result:
+                without_pom.append(label)
+
+        # 从模块自身的每个jar出发广度优先遍历，经过模块自身的jar继续向下
+        # （公共模块jar的依赖已在公共模块中检查），遇到不在本地的依赖时记录路径
+        own = {(dep['group_id'], dep['artifact_id']) for _, dep, _ in entries}
+        visited = set()
+        for label, dep, jar in entries:
+            queue = [((dep['group_id'], dep['artifact_id']), [label])]
+            while queue:
+                key, chain = queue.pop(0)
+                if key in visited:
+                    continue
+                visited.add(key)
+                for required in results[local[key][2]].get('dependencies', []):
+                    required_key = (required['group_id'], required['artifact_id'])
+                    coords = f"{required_key[0]}:{required_key[1]}"
+                    checked += 1
+                    if required_key in local:
+                        version, owner, _ = local[required_key]
+                        if required['version'] and required['version'] != version:
+                            print(f"  [--] [{module_name}] {chain[-1]} 需要 {coords}:{required['version']}，"
+                                  f"classpath中为 {version} ({owner})")
+                        if required_key in own:
+                            queue.append((required_key, chain + [owner]))
+                    elif required_key not in managed \
+                            and not repo.artifact_dir(*required_key, required['version']).is_dir():
+                        unresolved.setdefault((required_key, required['version']), chain)
+
+        for (key, version), chain in sorted(unresolved.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+            problems += 1
+            coords = f"{key[0]}:{key[1]}" + (f":{version}" if version else '')
+            print(f"  [WARN] [{module_name}] 依赖既不在本地lib中也未由pom.xml管理: {coords} "
+                  f"({' -> '.join(chain)})")
+        if without_pom:
+            print(f"  [--] [{module_name}] 无内嵌pom.xml，未检查其依赖: {', '.join(without_pom)}")
+        if problems == 0:
+            print(f"  [OK] [{module_name}] 传递依赖均可解析 ({len(entries)} 个jar, {checked} 个依赖)")
+        return problems
+
+    def _lock_file(self) -> Path:
+        """jars.lock 路径（与配置文件同目录）"""
+        return self.base_dir / LOCK_FILE
+
+    def write_lock(self) -> Path:
+        """生成 jars.lock，记录每个依赖jar的SHA-256和大小
+
+        源jar的摘要通过哈希缓存计算，jar未变化时不重新读取。
+
+        Returns:
+            锁文件路径
+        """
+        print("\n=== 生成jars.lock ===")
+        entries = self._lock_entries()
+        lock_file = self._lock_file()
+        state = "已更新" if write_if_changed(lock_file, self._render_lock(entries)) else "未变化"
+        print(f"[OK] {lock_file}: {len(entries)} 个jar ({state})\n")
+        return lock_file
+
+    def _lock_entries(self) -> Dict[str, Dict]:
+        """并行计算每个依赖jar的锁文件记录
+
+        Returns:
+            jar文件名 -> {'sha256', 'size', 'modules'}
+        """
+        jar_index = self._get_jar_index()
+        hash_cache = self._get_hash_cache()
+
+        jars = {}
+        for module_name, dep in self._iter_dependencies():
+            jar_file = Path(dep['jar_file']).as_posix()
+            if jar_index.resolve(jar_file) is None:
+                raise FileNotFoundError(f"[{module_name}] 源文件不存在: {dep['jar_file']}")
+            jars.setdefault(jar_file, []).append(module_name)
+
+        def lock_entry(jar_file):
+            src_file = jar_index.resolve(jar_file)
+            stat = src_file.stat()
+            return {'sha256': hash_cache.sha256(src_file, stat), 'size': stat.st_size}
+
+        names = sorted(jars)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            entries = dict(zip(names, executor.map(lock_entry, names)))
+        hash_cache.save()
+        for name in names:
+            entries[name]['modules'] = jars[name]
+        return entries
+
+    @staticmethod
+    def _render_lock(entries: Dict[str, Dict]) -> str:
+        """生成jars.lock内容"""
+        return json.dumps({'version': 1, 'jars': entries}, indent=2, ensure_ascii=False, sort_keys=True) + '\n'
+
+    def _project_root(self) -> Path:
+        """项目根目录（project.root，默认为配置文件的上级目录）"""
+        return self._resolve_path((self.config.get('project') or {}).get('root') or '..')
+
+    def export_bundle(self, output_file: str = DEFAULT_BUNDLE_FILE) -> Path:
+        """导出离线包
+
+        离线包为zip文件，包含：
+        - 所有被引用的jar，按SHA-256去重，每个内容只存一份（blobs/<sha256>.jar）
+        - 配置文件、jars.lock、生成的POM配置和各lib目录的README
+        - bundle.json：每个文件相对于项目根目录的路径及其内容
+
+        jar本身已是压缩格式，以存储方式写入；文本文件使用deflate压缩。
+        jar摘要通过哈希缓存并行计算，写入时分块流式复制，不把jar整个读入内存。
+
+        Returns:
+            离线包路径
+        """
+        print("\n=== 导出离线包 ===")
+        self._complete_dependencies()
+        root = self._project_root()
+        entries = self._lock_entries()
+        jar_index = self.jar_index
+
+        def relative(path: Path) -> Optional[str]:
+            rel = os.path.relpath(path, root)
+            return None if rel == '..' or rel.startswith('..' + os.sep) else Path(rel).as_posix()
+
+        files = []
+        blobs = {}
+        for jar_file, entry in sorted(entries.items()):
+            src_file = jar_index.resolve(jar_file)
+            blobs.setdefault(entry['sha256'], src_file)
+            # 源目录在项目之外（如共享目录）时只恢复lib目录中的jar
+            rel = relative(src_file)
+            if rel is not None:
+                files.append({'path': rel, 'sha256': entry['sha256'], 'size': entry['size']})
+        for module_config, module_name in self._iter_module_configs():
+            lib_dir = self._resolve_path(module_config['lib_dir'])
+            for dep in module_config.get('dependencies') or []:
+                jar_file = Path(dep['jar_file']).as_posix()
+                rel = relative(lib_dir / jar_file)
+                if rel is None:
+                    raise ValueError(f"[{module_name}] lib目录不在项目根目录 {root} 中: {lib_dir}")
+                entry = entries[jar_file]
+                files.append({'path': rel, 'sha256': entry['sha256'], 'size': entry['size']})
+
+        texts = {relative(self.config_file.resolve()): self.config_file.read_text(encoding='utf-8'),
+                 relative(self._lock_file().resolve()): self._render_lock(entries),
+                 relative(self.base_dir.resolve() / "generated-pom-configs.xml"): self._render_pom_config()}
+        for module_config, module_name in self._iter_module_configs():
+            if module_config is self.config.get('common') and not module_config.get('dependencies'):
+                continue
+            readme_file = self._resolve_path(module_config['lib_dir']) / "README.md"
+            texts[relative(readme_file)] = self._render_lib_readme(module_config, module_name)
+        texts.pop(None, None)
+
+        manifest = {
+            'version': 1,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'config': relative(self.config_file.resolve()),
+            'root': Path(os.path.relpath(root, self.base_dir.resolve())).as_posix(),
+            'files': files,
+            'texts': sorted(texts)
+        }
+
+        output_file = Path(output_file)
+        tmp_path = output_file.with_name(f".{output_file.name}.{os.getpid()}.tmp")
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+            zf.writestr(BUNDLE_MANIFEST, json.dumps(manifest, indent=2, ensure_ascii=False))
+            for rel, content in sorted(texts.items()):
+                zf.writestr(f"texts/{rel}", content)
+            for sha256, src_file in sorted(blobs.items()):
+                info = zipfile.ZipInfo(f"blobs/{sha256}.jar", date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_STORED
+                with open(src_file, 'rb') as src, zf.open(info, 'w', force_zip64=True) as dst:
+                    shutil.copyfileobj(src, dst, HASH_CHUNK_SIZE)
+        os.replace(tmp_path, output_file)
+
+        total = sum(entries[jar]['size'] for jar in entries)
+        print(f"[OK] 离线包已导出: {output_file} ({format_size(output_file.stat().st_size)})")
+        print(f"     {len(files)} 个jar文件（去重后 {len(blobs)} 个，{format_size(total)}），"
+              f"{len(texts)} 个文本文件\n")
+        return output_file
+
+    def verify_jars(self) -> int:
+        """按 jars.lock 校验所有源jar和lib目录中的jar
+
+        先比较大小（截断的复制不需要计算摘要即可发现），大小一致的文件再以
+        mmap方式并行计算SHA-256。不使用哈希缓存，每个文件都会被完整读取。
+
+        Returns:
+            问题数（缺失、大小不一致或摘要不一致）
+        """
+        print("\n=== 校验JAR文件 ===")
+        lock_file = self._lock_file()
+        if not lock_file.exists():
+            raise FileNotFoundError(f"锁文件不存在: {lock_file}，请先运行 --lock 生成")
+        with open(lock_file, 'r', encoding='utf-8') as f:
+            locked = json.load(f).get('jars', {})
+        jar_index = self._get_jar_index()
+
+        problems = 0
+        checks = []
+        for module_config, module_name in self._iter_module_configs():
+            lib_dir = self._resolve_path(module_config['lib_dir'])
+            for dep in module_config.get('dependencies') or []:
+                jar_file = Path(dep['jar_file']).as_posix()
+                entry = locked.get(jar_file)
+                if entry is None:
+                    problems += 1
+                    print(f"  [ERR] [{module_name}] {jar_file}: 未记录在 {LOCK_FILE} 中，请重新运行 --lock")
+                    continue
+                src_file = jar_index.resolve(jar_file)
+                for role, path in (("源文件", src_file), ("lib目录", lib_dir / jar_file)):
+                    if path is None or not path.exists():
+                        problems += 1
+                        print(f"  [ERR] [{module_name}] {jar_file}: {role}中不存在")
+                        continue
+                    size = path.stat().st_size
+                    if size != entry['size']:
+                        problems += 1
+                        reason = "文件被截断" if size < entry['size'] else "大小不一致"
+                        print(f"  [ERR] [{module_name}] {jar_file}: {role}{reason} "
+                              f"({size} 字节，期望 {entry['size']} 字节)")
+                        continue
+                    checks.append((module_name, jar_file, role, path, entry['sha256']))
+
+        started = time.perf_counter()
+        paths = sorted({path for _, _, _, path, _ in checks})
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            digests = dict(zip(paths, executor.map(partial(file_digest, use_mmap=True), paths)))
+        elapsed = time.perf_counter() - started
+        total = sum(path.stat().st_size for path in paths)
+
+        for module_name, jar_file, role, path, sha256 in checks:
+            if digests[path] != sha256:
+                problems += 1
+                print(f"  [ERR] [{module_name}] {jar_file}: {role}SHA-256不一致 ({path})")
+
+        print(f"校验 {len(paths)} 个文件 ({format_size(total)})，耗时 {elapsed:.2f} 秒，发现 {problems} 个问题\n")
+        return problems
+
+    @staticmethod
+    def _new_copy_stats() -> Dict:
+        """创建复制统计信息"""
+        return {
+            'copied': 0,
+            'linked': 0,
+            'skipped': 0,
+            'missing': 0,
+            'bytes_copied': 0,
+            'bytes_linked': 0,
+            'bytes_skipped': 0,
+            'methods': {}
+        }
 
     def setup_directories(self):
         """创建必要的目录结构"""
@@ -67,48 +2592,167 @@ class LibManager:
         jar_base.mkdir(parents=True, exist_ok=True)
         print(f"[OK] 创建jar源目录: {jar_base}")
 
-        # 创建公共模块lib目录
-        if 'common' in self.config and self.config['common']:
-            common_lib = self._resolve_path(self.config['common']['lib_dir'])
-            common_lib.mkdir(parents=True, exist_ok=True)
-            print(f"[OK] 创建公共模块lib目录: {common_lib}")
-
-        # 创建子项目lib目录
-        if 'modules' in self.config and self.config['modules']:
-            for module in self.config['modules']:
-                if not module:  # 跳过空配置
-                    continue
-                module_lib = self._resolve_path(module['lib_dir'])
-                module_lib.mkdir(parents=True, exist_ok=True)
+        # 创建公共模块和子项目lib目录
+        for module_config, _ in self._iter_module_configs():
+            module_lib = self._resolve_path(module_config['lib_dir'])
+            module_lib.mkdir(parents=True, exist_ok=True)
+            if module_config is self.config.get('common'):
+                print(f"[OK] 创建公共模块lib目录: {module_lib}")
+            else:
                 print(f"[OK] 创建模块lib目录: {module_lib}")
 
         print("目录结构创建完成!\n")
 
     def copy_jars(self):
-        """复制jar文件到各个模块的lib目录"""
+        """复制jar文件到各个模块的lib目录
+
+        所有模块的jar复制任务编入同一个操作计划，在有界线程池中并行执行。
+        """
         print("\n=== 复制JAR文件 ===")
-        jar_base = self._resolve_path(self.config['jar_sources']['base_dir'])
+        plan = OperationPlan()
+        self._plan_copy(plan)
+        plan.execute(self.workers)
+        self._print_copy_summary()
+        print("JAR文件复制完成!\n")
 
-        # 处理公共模块的jar
-        if 'common' in self.config and self.config['common']:
-            common_config = self.config['common']
-            if 'dependencies' in common_config and common_config['dependencies']:
-                self._copy_module_jars(jar_base, common_config, "公共模块")
+    def _print_copy_summary(self):
+        """打印复制统计"""
+        stats = self.copy_stats
+        if self.link_mode != 'copy':
+            print(f"链接: {stats['linked']} 个 ({format_size(stats['bytes_linked'])}), "
+                  f"存储目录: {self.jar_store.root}")
+        print(f"复制: {stats['copied']} 个 ({format_size(stats['bytes_copied'])}), "
+              f"跳过: {stats['skipped']} 个 ({format_size(stats['bytes_skipped'])}), "
+              f"缺失: {stats['missing']} 个")
+        if stats['methods']:
+            methods = ", ".join(f"{name}={count}" for name, count in sorted(stats['methods'].items()))
+            print(f"复制方式: {methods}")
 
-        # 处理子项目的jar
+    def build_plan(self, phases: List[str] = PLAN_PHASES, output_file: str = None) -> OperationPlan:
+        """将各步骤编译为操作计划
+
+        Args:
+            phases: 包含的步骤，见 PLAN_PHASES
+            output_file: POM配置输出路径
+
+        Returns:
+            操作计划（批量模式用 OperationPlan.merge 合并各配置的计划）
+        """
+        plan = OperationPlan()
+        # 每个操作记录所属步骤，供运行剖析按步骤统计
+        if 'setup' in phases:
+            plan.phase = 'setup'
+            self._plan_setup(plan)
+        if 'copy' in phases:
+            plan.phase = 'copy'
+            self._plan_copy(plan)
+        if 'generate' in phases or 'readme' in phases:
+            self._complete_dependencies()
+        if 'generate' in phases:
+            plan.phase = 'generate'
+            self._plan_pom_config(plan, output_file)
+        if 'readme' in phases:
+            plan.phase = 'readme'
+            self._plan_readme(plan)
+        if 'prune' in phases:
+            plan.phase = 'prune'
+            self._plan_prune(plan)
+        plan.phase = None
+        return plan
+
+    def _iter_module_configs(self):
+        """遍历公共模块和所有子项目的配置
+
+        Yields:
+            (模块配置, 模块名称)
+        """
+        seen = set()
+        if 'common' in self.config and self.config['common']:
+            seen.add(self._resolve_path(self.config['common']['lib_dir']))
+            yield self.config['common'], "公共模块"
         if 'modules' in self.config and self.config['modules']:
             for module in self.config['modules']:
-                if not module:  # 跳过空配置
-                    continue
-                self._copy_module_jars(jar_base, module, f"模块 {module['module_name']}")
+                if module:
+                    seen.add(self._resolve_path(module['lib_dir']))
+                    yield module, module['module_name']
+        # 模式匹配到的模块与显式声明的模块（或前面的模式）重复时，以先声明的为准
+        for pattern in self.config.get('module_patterns') or []:
+            for module in self._expand_module_pattern(pattern):
+                lib_dir = self._resolve_path(module['lib_dir'])
+                if lib_dir not in seen:
+                    seen.add(lib_dir)
+                    yield module, module['module_name']
 
-        print("JAR文件复制完成!\n")
+    def _expand_module_pattern(self, pattern: Dict) -> List[Dict]:
+        """展开模块路径模式，结果在配置重新加载前缓存
+
+        模式相对于项目根目录（project.root，默认为配置文件的上级目录），支持 * 和 **；
+        只有包含pom.xml、且packaging不是pom（聚合/父POM）的目录才视为模块。
+        所有匹配的模块共享模式的依赖列表。
+
+        Args:
+            pattern: module_patterns中的一项
+
+        Returns:
+            模块配置列表
+        """
+        modules = self._pattern_modules.get(id(pattern))
+        if modules is not None:
+            return modules
+
+        root = self._project_root()
+        lib_name = pattern.get('lib_dir', 'lib')
+        dependencies = pattern.get('dependencies') or []
+        modules = []
+        for match in sorted(glob.glob(os.path.join(root, pattern['path']), recursive=True)):
+            module_dir = Path(match)
+            pom_file = module_dir / 'pom.xml'
+            if not pom_file.is_file() or self._is_aggregator_pom(pom_file):
+                continue
+            modules.append({
+                'module_name': module_dir.relative_to(root).as_posix(),
+                'lib_dir': str(module_dir / lib_name),
+                'dependencies': dependencies
+            })
+        self._pattern_modules[id(pattern)] = modules
+        return modules
+
+    @staticmethod
+    def _is_aggregator_pom(pom_file: Path) -> bool:
+        """pom.xml的packaging是否为pom（聚合或父POM，没有自己的代码和依赖jar）"""
+        try:
+            return (parse_pom(pom_file).findtext('packaging') or '').strip() == 'pom'
+        except ET.ParseError:
+            return False
+
+    def _plan_setup(self, plan: OperationPlan):
+        """计划创建jar源目录和所有lib目录"""
+        plan.mkdir(self._resolve_path(self.config['jar_sources']['base_dir']))
+        for module_config, _ in self._iter_module_configs():
+            plan.mkdir(self._resolve_path(module_config['lib_dir']))
+
+    def _plan_copy(self, plan: OperationPlan):
+        """计划复制（或链接）所有模块的jar"""
+        jar_base = self._resolve_path(self.config['jar_sources']['base_dir'])
+        jar_index = self._get_jar_index()
+        self.copy_stats = self._new_copy_stats()
+        if self.link_mode != 'copy':
+            self.jar_store = JarStore(jar_base / STORE_DIR, self._get_hash_cache())
+        if self.link_mode != 'copy' or self.incremental:
+            plan.add_finalizer(self._get_hash_cache().save)
 
-    def _copy_module_jars(self, jar_base: Path, module_config: Dict, module_name: str):
-        """复制单个模块的jar文件
+        for module_config, module_name in self._iter_module_configs():
+            if module_config is self.config.get('common') and not module_config.get('dependencies'):
+                continue
+            label = module_name if module_config is self.config.get('common') else f"模块 {module_name}"
+            self._copy_module_jars(plan, jar_index, module_config, label)
+
+    def _copy_module_jars(self, plan: OperationPlan, jar_index: JarIndex, module_config: Dict, module_name: str):
+        """将单个模块的jar复制操作加入计划
 
         Args:
-            jar_base: jar源目录
+            plan: 操作计划
+            jar_index: jar源目录索引
             module_config: 模块配置
             module_name: 模块名称（用于显示）
         """
@@ -119,17 +2763,306 @@ class LibManager:
             print(f"  [{module_name}] 无jar依赖配置")
             return
 
-        for dep in dependencies:
-            jar_file = dep['jar_file']
-            src_file = jar_base / jar_file
-            dst_file = lib_dir / jar_file
+        mkdir = plan.mkdir(lib_dir)
+        manifest = LibManifest(lib_dir) if self.incremental else None
+        if manifest is not None:
+            plan.add_finalizer(manifest.save)
+
+        for dep in dependencies:
+            jar_file = dep['jar_file']
+            src_file = jar_index.resolve(jar_file)
+            dst_file = lib_dir / jar_file
+
+            if src_file is None:
+                print(f"  [ERR] [{module_name}] 源文件不存在: {jar_file} "
+                      f"(已查找: {', '.join(str(root) for root in jar_index.roots)})")
+                self._add_copy_stats(missing=1)
+                continue
+
+            self._plan_jar(plan, src_file, src_file.stat(), dst_file, manifest, module_name, mkdir)
+
+    def _plan_jar(self, plan: OperationPlan, src_file: Path, src_stat: os.stat_result, dst_file: Path,
+                  manifest: Optional[LibManifest], module_name: str, mkdir: PlanAction) -> PlanAction:
+        """将单个jar的复制（或链接）操作加入计划
+
+        src_stat 传给操作本身，执行时不再对源文件（可能在NFS上）做stat。
+
+        Returns:
+            新添加的操作
+        """
+        key = manifest.key(dst_file) if manifest is not None else None
+        unchanged = (manifest is not None and manifest.matches(key, src_stat)
+                     and dst_file.exists() and manifest.matches(key, dst_file.stat()))
+        if self.link_mode != 'copy':
+            func = partial(self._link_jar, src_file, dst_file, manifest, module_name, src_stat)
+            kind = 'link'
+        else:
+            func = partial(self._copy_jar, src_file, dst_file, manifest, module_name, src_stat)
+            kind = 'copy'
+        return plan.add(kind, dst_file, func, 0 if unchanged else src_stat.st_size, [mkdir],
+                        "未变化，将跳过" if unchanged else f"<- {src_file}")
+
+    def _plan_pom_config(self, plan: OperationPlan, output_file: str = None):
+        """计划生成POM配置文件"""
+        output_file = Path(output_file) if output_file else self.base_dir / "generated-pom-configs.xml"
+        content = self._render_pom_config()
+
+        def write():
+            self._write_output(output_file, content)
+            log(f"[OK] Maven配置已生成: {output_file}")
+
+        plan.add('write', output_file, write, len(content.encode('utf-8')))
+
+    def _plan_readme(self, plan: OperationPlan):
+        """计划生成各lib目录的README"""
+        for module_config, module_name in self._iter_module_configs():
+            if module_config is self.config.get('common') and not module_config.get('dependencies'):
+                continue
+            lib_dir = self._resolve_path(module_config['lib_dir'])
+            readme_file = lib_dir / "README.md"
+            content = self._render_lib_readme(module_config, module_name)
+
+            def write(readme_file=readme_file, content=content):
+                self._write_output(readme_file, content)
+                log(f"  [OK] 生成README: {readme_file}")
+
+            plan.add('write', readme_file, write, len(content.encode('utf-8')), [plan.mkdir(lib_dir)])
+
+    def prune_jars(self):
+        """删除各lib目录中不再由配置引用的jar"""
+        print("\n=== 清理lib目录 ===")
+        plan = OperationPlan()
+        self._plan_prune(plan)
+        plan.execute(self.workers)
+        print(f"清理完成，删除 {len(plan.actions)} 个jar\n")
+
+    def _plan_prune(self, plan: OperationPlan):
+        """计划删除lib目录中不再由配置引用的jar
+
+        按lib目录汇总配置中的jar（多个模块共用一个lib目录时取并集），
+        只用scandir列出目录项，不对任何文件做stat；清单中有记录的jar
+        直接从清单读取大小用于显示，删除后同时移除清单记录。
+        """
+        desired = {}
+        for module_config, _ in self._iter_module_configs():
+            lib_dir = self._resolve_path(module_config['lib_dir'])
+            jars = desired.setdefault(lib_dir, set())
+            for dep in module_config.get('dependencies') or []:
+                jars.add(Path(dep['jar_file']).as_posix())
+
+        for lib_dir, jars in desired.items():
+            stale = []
+            stack = ['']
+            while stack:
+                rel = stack.pop()
+                try:
+                    with os.scandir(lib_dir / rel if rel else lib_dir) as entries:
+                        for entry in entries:
+                            if entry.name.startswith('.'):
+                                continue
+                            child = f"{rel}/{entry.name}" if rel else entry.name
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(child)
+                            elif entry.name.endswith('.jar') and child not in jars:
+                                stale.append(child)
+                except FileNotFoundError:
+                    continue
+            if not stale:
+                continue
+
+            manifest = LibManifest(lib_dir)
+            plan.add_finalizer(manifest.save)
+            for rel in sorted(stale):
+                target = lib_dir / rel
+                entry = manifest.get(rel)
+                detail = f"释放 {format_size(entry['size'])}" if entry else "未在配置中"
+                plan.add('remove', target, partial(self._remove_jar, target, manifest), detail=detail)
+
+    @staticmethod
+    def _remove_jar(target: Path, manifest: LibManifest):
+        """删除不再使用的jar及其清单记录"""
+        try:
+            target.unlink()
+        except FileNotFoundError:
+            pass
+        manifest.remove(manifest.key(target))
+        log(f"  [OK] 删除: {target}")
+
+    def _write_output(self, path: Path, content: str) -> bool:
+        """写入生成的文件（内容不变时不写），并记录到运行剖析
+
+        Returns:
+            是否写入了文件
+        """
+        started = time.perf_counter()
+        written = write_if_changed(path, content)
+        size = len(content.encode('utf-8'))
+        self.profiler.record('write' if written else 'unchanged', path, time.perf_counter() - started,
+                             bytes_read=0 if written else size, bytes_written=size if written else 0)
+        return written
+
+    def _source_root(self, src_file: Path) -> Optional[Path]:
+        """查找源文件所在的jar源目录"""
+        if self.jar_index is None:
+            return None
+        for root in self.jar_index.roots:
+            if src_file == root or root in src_file.parents:
+                return root
+        return None
+
+    def _add_copy_stats(self, method: str = None, **counts):
+        """线程安全地累加复制统计"""
+        with self._stats_lock:
+            for key, value in counts.items():
+                self.copy_stats[key] += value
+            if method:
+                methods = self.copy_stats['methods']
+                methods[method] = methods.get(method, 0) + 1
+
+    def _copy_jar(self, src_file: Path, dst_file: Path, manifest: Optional[LibManifest], module_name: str,
+                  src_stat: os.stat_result = None):
+        """复制单个jar文件
+
+        增量模式下，目标文件与清单记录一致、且源文件未变化时跳过复制。
+        源文件的大小和修改时间与清单一致时直接判定未变化；否则比较SHA-256。
+        清单中记录的摘要取自复制过程（普通读写时）或源文件的哈希缓存，不再回读目标文件。
+
+        Args:
+            src_file: 源文件
+            dst_file: 目标文件
+            manifest: 目标lib目录的清单，None表示非增量模式
+            module_name: 模块名称（用于显示）
+            src_stat: 构建计划时得到的源文件stat结果，为None时重新获取
+        """
+        started = time.perf_counter()
+        jar_file = dst_file.name
+        if src_stat is None:
+            src_stat = src_file.stat()
+        key = manifest.key(dst_file) if manifest is not None else None
+        entry = manifest.get(key) if manifest is not None else None
+
+        if entry is not None and dst_file.exists() and manifest.matches(key, dst_file.stat()):
+            bytes_read = 0
+            if manifest.matches(key, src_stat):
+                unchanged = True
+            else:
+                unchanged = entry['size'] == src_stat.st_size
+                if unchanged:
+                    unchanged = self._get_hash_cache().sha256(src_file, src_stat) == entry['sha256']
+                    bytes_read = src_stat.st_size
+            if unchanged:
+                self._add_copy_stats(skipped=1, bytes_skipped=src_stat.st_size)
+                self.profiler.record('skip', dst_file, time.perf_counter() - started,
+                                     bytes_read=bytes_read, root=self._source_root(src_file))
+                log(f"  [SKIP] [{module_name}] 未变化: {jar_file}")
+                return
+
+        digest = hashlib.sha256() if manifest is not None else None
+        method = copy_file_fast(src_file, dst_file, digest)
+        if manifest is not None:
+            if method == 'copy':
+                sha256 = digest.hexdigest()
+            else:
+                sha256 = self._get_hash_cache().sha256(src_file, src_stat)
+            manifest.update(key, dst_file.stat(), sha256)
+        self.profiler.record('copy', dst_file, time.perf_counter() - started, bytes_read=src_stat.st_size,
+                             bytes_written=src_stat.st_size, root=self._source_root(src_file))
+        self._add_copy_stats(method, copied=1, bytes_copied=src_stat.st_size)
+        log(f"  [OK] [{module_name}] 复制: {jar_file}")
+
+    def _link_jar(self, src_file: Path, dst_file: Path, manifest: Optional[LibManifest], module_name: str,
+                  src_stat: os.stat_result = None):
+        """将jar加入共享存储，并在lib目录中创建指向存储对象的链接
+
+        目标已经是指向同一存储对象的链接时跳过。
+
+        Args:
+            src_file: 源文件
+            dst_file: 目标文件
+            manifest: 目标lib目录的清单，None表示非增量模式
+            module_name: 模块名称（用于显示）
+            src_stat: 构建计划时得到的源文件stat结果，为None时重新获取
+        """
+        started = time.perf_counter()
+        jar_file = dst_file.name
+        key = manifest.key(dst_file) if manifest is not None else None
+        obj, sha256 = self.jar_store.add(src_file, src_stat)
+        size = obj.stat().st_size
+
+        if os.path.lexists(dst_file):
+            if self.link_mode == 'symlink':
+                linked = dst_file.is_symlink() and os.readlink(dst_file) == os.path.relpath(obj, dst_file.parent)
+            else:
+                linked = not dst_file.is_symlink() and os.path.samefile(dst_file, obj)
+            if linked:
+                if manifest is not None and manifest.get(key) is None:
+                    manifest.update(key, dst_file.stat(), sha256)
+                self._add_copy_stats(skipped=1, bytes_skipped=size)
+                self.profiler.record('skip', dst_file, time.perf_counter() - started,
+                                     root=self._source_root(src_file))
+                log(f"  [SKIP] [{module_name}] 已链接: {jar_file}")
+                return
+
+        method = link_file(obj, dst_file, self.link_mode)
+        if manifest is not None:
+            manifest.update(key, dst_file.stat(), sha256)
+        copied = size if method != self.link_mode else 0
+        self.profiler.record('link' if not copied else 'copy', dst_file, time.perf_counter() - started,
+                             bytes_read=copied, bytes_written=copied, root=self._source_root(src_file))
+        if method == self.link_mode:
+            self._add_copy_stats(method, linked=1, bytes_linked=size)
+            log(f"  [OK] [{module_name}] 链接: {jar_file} -> {obj.name}")
+        else:
+            self._add_copy_stats(method, copied=1, bytes_copied=size)
+            log(f"  [OK] [{module_name}] 复制: {jar_file}（无法创建硬链接）")
+
+    def install_local_repo(self, repo_dir: str = None) -> int:
+        """将所有配置的jar直接安装到Maven本地仓库
+
+        替代每次构建时执行的maven-install-plugin:install-file。
+        同一个GAV只安装一次，按groupId:artifactId分组并行处理。
+
+        Args:
+            repo_dir: 本地仓库路径，默认为初始化时指定的local_repo
+
+        Returns:
+            新安装的jar数量
+        """
+        print("\n=== 安装到Maven本地仓库 ===")
+        self._complete_dependencies()
+        repo_dir = repo_dir or self.local_repo
+        installer = LocalRepoInstaller(Path(repo_dir) if repo_dir else default_local_repository())
+        print(f"[OK] 本地仓库: {installer.repo_dir}")
+        jar_index = self._get_jar_index()
+
+        # (groupId, artifactId) -> {version: 源jar}
+        artifacts = {}
+        for module_name, dep in self._iter_dependencies():
+            src_file = jar_index.resolve(dep['jar_file'])
+            if src_file is None:
+                raise FileNotFoundError(f"[{module_name}] 源文件不存在: {dep['jar_file']}")
+            versions = artifacts.setdefault((dep['group_id'], dep['artifact_id']), {})
+            versions.setdefault(dep['version'], src_file)
 
-            if not src_file.exists():
-                print(f"  [ERR] [{module_name}] 源文件不存在: {src_file}")
-                continue
+        def install_artifact(key):
+            group_id, artifact_id = key
+            installed = []
+            for version, src_file in artifacts[key].items():
+                if installer.install(src_file, group_id, artifact_id, version):
+                    installed.append(version)
+                    log(f"  [OK] 安装: {group_id}:{artifact_id}:{version}")
+                else:
+                    log(f"  [SKIP] 已是最新: {group_id}:{artifact_id}:{version}")
+            installer.update_metadata(group_id, artifact_id, list(artifacts[key]))
+            return len(installed)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            installed = sum(executor.map(install_artifact, sorted(artifacts)))
 
-            shutil.copy2(src_file, dst_file)
-            print(f"  [OK] [{module_name}] 复制: {jar_file}")
+        total = sum(len(versions) for versions in artifacts.values())
+        print(f"安装: {installed} 个, 跳过: {total - installed} 个")
+        print("本地仓库安装完成!\n")
+        return installed
 
     def generate_pom_config(self, output_file: str = None):
         """生成Maven POM配置文件
@@ -138,51 +3071,53 @@ class LibManager:
             output_file: 输出文件路径，默认为当前目录下的generated-pom-configs.xml
         """
         print("\n=== 生成Maven配置 ===")
+        self._complete_dependencies()
 
         if output_file is None:
             output_file = self.base_dir / "generated-pom-configs.xml"
         else:
             output_file = Path(output_file)
 
-        # 生成XML内容
-        configs = []
+        self._write_output(output_file, self._render_pom_config())
 
-        # 公共模块配置
-        if 'common' in self.config and self.config['common']:
-            common_config = self.config['common']
-            if 'dependencies' in common_config and common_config['dependencies']:
-                config = self._generate_module_pom_config(common_config, "公共模块 (common)")
-                configs.append(config)
+        print(f"[OK] Maven配置已生成: {output_file}")
+        print("\n请将生成的配置复制到对应模块的pom.xml中\n")
 
-        # 子项目配置
-        if 'modules' in self.config and self.config['modules']:
-            for module in self.config['modules']:
-                if not module:
+    def _render_pom_config(self) -> str:
+        """生成POM配置文件内容
+
+        Returns:
+            XML文本
+        """
+        configs = []
+
+        # 公共模块和子项目配置
+        for module_config, module_name in self._iter_module_configs():
+            if module_config is self.config.get('common'):
+                if not module_config.get('dependencies'):
                     continue
-                config = self._generate_module_pom_config(module, f"模块 ({module['module_name']})")
-                configs.append(config)
-
-        # 写入文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-            f.write('<!--\n')
-            f.write('  自动生成的Maven POM配置片段\n')
-            f.write('  \n')
-            f.write('  使用方法：\n')
-            f.write('  1. 复制对应模块的 <plugin> 配置到该模块的 pom.xml 的 <build><plugins> 中\n')
-            f.write('  2. 复制对应模块的 <dependency> 配置到该模块的 pom.xml 的 <dependencies> 中\n')
-            f.write('  3. 确保 lib 目录中有相应的 jar 文件\n')
-            f.write('-->\n\n')
-            f.write('<maven-configs>\n\n')
-
-            for config in configs:
-                f.write(config)
-                f.write('\n\n')
-
-            f.write('</maven-configs>\n')
+                title = "公共模块 (common)"
+            else:
+                title = f"模块 ({module_name})"
+            configs.append(self._generate_module_pom_config(module_config, title))
 
-        print(f"[OK] Maven配置已生成: {output_file}")
-        print("\n请将生成的配置复制到对应模块的pom.xml中\n")
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            '<!--\n',
+            '  自动生成的Maven POM配置片段\n',
+            '  \n',
+            '  使用方法：\n',
+            '  1. 复制对应模块的 <plugin> 配置到该模块的 pom.xml 的 <build><plugins> 中\n',
+            '  2. 复制对应模块的 <dependency> 配置到该模块的 pom.xml 的 <dependencies> 中\n',
+            '  3. 确保 lib 目录中有相应的 jar 文件\n',
+            '-->\n\n',
+            '<maven-configs>\n\n'
+        ]
+        for config in configs:
+            lines.append(config)
+            lines.append('\n\n')
+        lines.append('</maven-configs>\n')
+        return ''.join(lines)
 
     def _generate_module_pom_config(self, module_config: Dict, title: str) -> str:
         """生成单个模块的POM配置
@@ -201,7 +3136,54 @@ class LibManager:
         lines = []
         lines.append(f"  <!-- ========== {title} ========== -->")
         lines.append("")
-        lines.append("  <!-- 第1步: 添加到 <build><plugins> 中 -->")
+        if self.pom_install == 'local-repo':
+            lines.append("  <!-- 第1步: 无需maven-install-plugin，构建前执行 python lib_manager.py --install-local-repo -->")
+            lines.append("")
+        elif self.pom_install == 'profile':
+            lines.append("  <!-- 第1步: 添加到 <profiles> 中（仅当本地仓库缺少对应jar时激活安装） -->")
+            for dep in dependencies:
+                lines.extend(self._generate_install_profile(dep))
+            lines.append("")
+        else:
+            lines.append("  <!-- 第1步: 添加到 <build><plugins> 中 -->")
+            lines.extend(self._generate_install_plugin(dependencies))
+            lines.append("")
+        lines.append("  <!-- 第2步: 添加到 <dependencies> 中 -->")
+
+        for dep in dependencies:
+            lines.extend(self._generate_dependency(dep))
+
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _generate_dependency(dep: Dict) -> List[str]:
+        """生成单个依赖声明
+
+        Args:
+            dep: 依赖配置
+
+        Returns:
+            XML配置行
+        """
+        return [
+            f"  <!-- {dep.get('description', dep['artifact_id'])} -->",
+            "  <dependency>",
+            f"    <groupId>{dep['group_id']}</groupId>",
+            f"    <artifactId>{dep['artifact_id']}</artifactId>",
+            f"    <version>{dep['version']}</version>",
+            "  </dependency>"
+        ]
+
+    def _generate_install_plugin(self, dependencies: List[Dict]) -> List[str]:
+        """生成maven-install-plugin配置
+
+        Args:
+            dependencies: 依赖配置列表
+
+        Returns:
+            XML配置行
+        """
+        lines = []
         lines.append("  <plugin>")
         lines.append("    <groupId>org.apache.maven.plugins</groupId>")
         lines.append("    <artifactId>maven-install-plugin</artifactId>")
@@ -209,57 +3191,142 @@ class LibManager:
         lines.append("    <executions>")
 
         for dep in dependencies:
-            execution_id = f"install-{dep['artifact_id']}"
-            lines.append(f"      <!-- {dep.get('description', dep['artifact_id'])} -->")
-            lines.append("      <execution>")
-            lines.append(f"        <id>{execution_id}</id>")
-            lines.append("        <phase>validate</phase>")
-            lines.append("        <goals>")
-            lines.append("          <goal>install-file</goal>")
-            lines.append("        </goals>")
-            lines.append("        <configuration>")
-            lines.append(f"          <file>${{project.basedir}}/lib/{dep['jar_file']}</file>")
-            lines.append(f"          <groupId>{dep['group_id']}</groupId>")
-            lines.append(f"          <artifactId>{dep['artifact_id']}</artifactId>")
-            lines.append(f"          <version>{dep['version']}</version>")
-            lines.append("          <packaging>jar</packaging>")
-            lines.append("          <generatePom>true</generatePom>")
-            lines.append("        </configuration>")
-            lines.append("      </execution>")
+            lines.extend(self._generate_install_execution(dep))
 
         lines.append("    </executions>")
         lines.append("  </plugin>")
-        lines.append("")
-        lines.append("  <!-- 第2步: 添加到 <dependencies> 中 -->")
+        return lines
 
-        for dep in dependencies:
-            lines.append(f"  <!-- {dep.get('description', dep['artifact_id'])} -->")
-            lines.append("  <dependency>")
-            lines.append(f"    <groupId>{dep['group_id']}</groupId>")
-            lines.append(f"    <artifactId>{dep['artifact_id']}</artifactId>")
-            lines.append(f"    <version>{dep['version']}</version>")
-            lines.append("  </dependency>")
+    @staticmethod
+    def _generate_install_execution(dep: Dict) -> List[str]:
+        """生成单个jar的install-file执行配置
 
-        return '\n'.join(lines)
+        Args:
+            dep: 依赖配置
+
+        Returns:
+            XML配置行
+        """
+        execution_id = f"install-{dep['artifact_id']}"
+        return [
+            f"      <!-- {dep.get('description', dep['artifact_id'])} -->",
+            "      <execution>",
+            f"        <id>{execution_id}</id>",
+            "        <phase>validate</phase>",
+            "        <goals>",
+            "          <goal>install-file</goal>",
+            "        </goals>",
+            "        <configuration>",
+            f"          <file>${{project.basedir}}/lib/{dep['jar_file']}</file>",
+            f"          <groupId>{dep['group_id']}</groupId>",
+            f"          <artifactId>{dep['artifact_id']}</artifactId>",
+            f"          <version>{dep['version']}</version>",
+            "          <packaging>jar</packaging>",
+            "          <generatePom>true</generatePom>",
+            "        </configuration>",
+            "      </execution>"
+        ]
+
+    def _generate_install_profile(self, dep: Dict) -> List[str]:
+        """生成单个jar的按需安装profile
+
+        profile通过 <activation><file><missing> 判断本地仓库中是否已有该构件，
+        已安装时不激活，后续构建不再执行install-file。
+
+        Args:
+            dep: 依赖配置
+
+        Returns:
+            XML配置行
+        """
+        repo = Path(self.local_repo).as_posix() if self.local_repo else DEFAULT_PROFILE_REPO
+        group_path = dep['group_id'].replace('.', '/')
+        artifact_id = dep['artifact_id']
+        version = dep['version']
+        missing = f"{repo}/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.jar"
+
+        lines = []
+        lines.append(f"  <!-- {dep.get('description', artifact_id)} -->")
+        lines.append("  <profile>")
+        lines.append(f"    <id>install-{artifact_id}</id>")
+        lines.append("    <activation>")
+        lines.append("      <file>")
+        lines.append(f"        <missing>{missing}</missing>")
+        lines.append("      </file>")
+        lines.append("    </activation>")
+        lines.append("    <build>")
+        lines.append("      <plugins>")
+        lines.extend(f"      {line}" for line in self._generate_install_plugin([dep]))
+        lines.append("      </plugins>")
+        lines.append("    </build>")
+        lines.append("  </profile>")
+        return lines
+
+    def patch_poms(self) -> int:
+        """直接修改各模块的pom.xml
+
+        只插入或更新本工具管理的依赖声明和安装配置（按 pom_install 方式），
+        保留原有格式和注释；文件内容未变化时不写入，避免触发增量构建和CI变更检测。
+        模块pom.xml默认为lib_dir的上级目录中的pom.xml，可通过模块配置的pom_file指定。
+
+        Returns:
+            被修改的pom.xml数量
+        """
+        print("\n=== 更新模块pom.xml ===")
+        self._complete_dependencies()
+
+        changed = 0
+        for module_config, module_name in self._iter_module_configs():
+            dependencies = module_config.get('dependencies') or []
+            if not dependencies:
+                continue
+            pom_file = self._module_pom_file(module_config)
+            if not pom_file.exists():
+                print(f"  [ERR] [{module_name}] pom.xml不存在: {pom_file}")
+                continue
+
+            patcher = PomPatcher(pom_file)
+            for dep in dependencies:
+                patcher.ensure_dependency(dep, self._generate_dependency(dep))
+                # 只保留当前安装方式的配置，切换方式时删除其他方式留下的配置
+                if self.pom_install == 'plugin':
+                    patcher.remove_profile(dep)
+                    patcher.ensure_install_execution(dep, self._generate_install_plugin([dep]),
+                                                     self._generate_install_execution(dep))
+                elif self.pom_install == 'profile':
+                    patcher.remove_install_execution(dep)
+                    patcher.ensure_profile(dep, self._generate_install_profile(dep))
+                else:
+                    patcher.remove_install_execution(dep)
+                    patcher.remove_profile(dep)
+
+            if patcher.save():
+                changed += 1
+                print(f"  [OK] [{module_name}] 已更新: {pom_file}")
+                for change in patcher.changes:
+                    print(f"       - {change}")
+            else:
+                print(f"  [SKIP] [{module_name}] 无变化: {pom_file}")
+
+        print(f"更新了 {changed} 个pom.xml\n")
+        return changed
+
+    def _module_pom_file(self, module_config: Dict) -> Path:
+        """模块pom.xml路径：配置的pom_file，默认为lib_dir上级目录中的pom.xml"""
+        if module_config.get('pom_file'):
+            return self._resolve_path(module_config['pom_file'])
+        return self._resolve_path(module_config['lib_dir']).parent / "pom.xml"
 
     def generate_readme(self):
         """在各个lib目录生成README文件"""
         print("\n=== 生成README文件 ===")
+        self._complete_dependencies()
 
-        # 公共模块README
-        if 'common' in self.config and self.config['common']:
-            common_config = self.config['common']
-            if 'dependencies' in common_config and common_config['dependencies']:
-                lib_dir = self._resolve_path(common_config['lib_dir'])
-                self._generate_lib_readme(lib_dir, common_config, "公共模块")
-
-        # 子项目README
-        if 'modules' in self.config and self.config['modules']:
-            for module in self.config['modules']:
-                if not module:
-                    continue
-                lib_dir = self._resolve_path(module['lib_dir'])
-                self._generate_lib_readme(lib_dir, module, module['module_name'])
+        for module_config, module_name in self._iter_module_configs():
+            if module_config is self.config.get('common') and not module_config.get('dependencies'):
+                continue
+            lib_dir = self._resolve_path(module_config['lib_dir'])
+            self._generate_lib_readme(lib_dir, module_config, module_name)
 
         print("README文件生成完成!\n")
 
@@ -272,55 +3339,76 @@ class LibManager:
             module_name: 模块名称
         """
         readme_file = lib_dir / "README.md"
+        self._write_output(readme_file, self._render_lib_readme(module_config, module_name))
+
+        print(f"  [OK] 生成README: {readme_file}")
+
+    def _render_lib_readme(self, module_config: Dict, module_name: str) -> str:
+        """生成单个lib目录的README内容
+
+        Args:
+            module_config: 模块配置
+            module_name: 模块名称
+
+        Returns:
+            Markdown文本
+        """
         dependencies = module_config.get('dependencies', [])
+        lines = []
+        lines.append(f"# {module_name} - 本地Jar依赖说明\n\n")
+        lines.append("## 依赖清单\n\n")
 
-        with open(readme_file, 'w', encoding='utf-8') as f:
-            f.write(f"# {module_name} - 本地Jar依赖说明\n\n")
-            f.write("## 依赖清单\n\n")
+        if not dependencies:
+            lines.append("暂无本地jar依赖\n")
+        else:
+            lines.append("| Jar文件 | GroupId | ArtifactId | Version | 说明 |\n")
+            lines.append("|---------|---------|------------|---------|------|\n")
 
-            if not dependencies:
-                f.write("暂无本地jar依赖\n")
-            else:
-                f.write("| Jar文件 | GroupId | ArtifactId | Version | 说明 |\n")
-                f.write("|---------|---------|------------|---------|------|\n")
-
-                for dep in dependencies:
-                    jar = dep['jar_file']
-                    group = dep['group_id']
-                    artifact = dep['artifact_id']
-                    version = dep['version']
-                    desc = dep.get('description', '-')
-                    f.write(f"| {jar} | {group} | {artifact} | {version} | {desc} |\n")
-
-            f.write("\n## 使用说明\n\n")
-            f.write("这些jar文件通过maven-install-plugin在构建时自动安装到本地Maven仓库。\n\n")
-            f.write("### 构建时自动安装\n\n")
-            f.write("```bash\n")
-            f.write("mvn clean install\n")
-            f.write("```\n\n")
-            f.write("### 验证依赖\n\n")
-            f.write("```bash\n")
-            f.write("mvn dependency:tree\n")
-            f.write("```\n\n")
-            f.write("## 注意事项\n\n")
-            f.write("1. 这些jar文件已提交到Git仓库\n")
-            f.write("2. 构建时会自动处理，无需手动安装\n")
-            f.write("3. Jenkins构建时也会自动处理\n\n")
-            f.write("## 更新历史\n\n")
-            f.write("- 由 lib_manager.py 自动生成\n")
+            for dep in dependencies:
+                jar = dep['jar_file']
+                group = dep['group_id']
+                artifact = dep['artifact_id']
+                version = dep['version']
+                desc = dep.get('description', '-')
+                lines.append(f"| {jar} | {group} | {artifact} | {version} | {desc} |\n")
 
-        print(f"  [OK] 生成README: {readme_file}")
+        lines.append("\n## 使用说明\n\n")
+        lines.append("这些jar文件通过maven-install-plugin在构建时自动安装到本地Maven仓库。\n\n")
+        lines.append("### 构建时自动安装\n\n")
+        lines.append("```bash\n")
+        lines.append("mvn clean install\n")
+        lines.append("```\n\n")
+        lines.append("### 验证依赖\n\n")
+        lines.append("```bash\n")
+        lines.append("mvn dependency:tree\n")
+        lines.append("```\n\n")
+        lines.append("## 注意事项\n\n")
+        lines.append("1. 这些jar文件已提交到Git仓库\n")
+        lines.append("2. 构建时会自动处理，无需手动安装\n")
+        lines.append("3. Jenkins构建时也会自动处理\n\n")
+        lines.append("## 更新历史\n\n")
+        lines.append("- 由 lib_manager.py 自动生成\n")
+        return ''.join(lines)
+
+    def run_all(self, phases: List[str] = PLAN_PHASES):
+        """执行所有操作
 
-    def run_all(self):
-        """执行所有操作"""
+        创建目录、复制jar、生成配置和README被编译为一个操作计划，
+        目录批量创建，其余相互独立的操作并行执行。
+
+        Args:
+            phases: 包含的步骤，默认为 PLAN_PHASES；可追加 OPTIONAL_PLAN_PHASES 中的步骤
+        """
         print("=" * 60)
         print(" Maven本地Jar依赖管理工具")
         print("=" * 60)
 
-        self.setup_directories()
-        self.copy_jars()
-        self.generate_pom_config()
-        self.generate_readme()
+        with self.profiler.phase('plan'):
+            plan = self.build_plan(phases)
+        print(f"\n=== 执行操作计划（{len(plan.actions)} 个操作） ===")
+        with self.profiler.phase('execute'):
+            plan.execute(self.workers, self.profiler)
+        self._print_copy_summary()
 
         print("=" * 60)
         print(" 处理完成!")
@@ -332,6 +3420,430 @@ class LibManager:
         print()
 
 
+class BundleImporter:
+    """离线包导入
+
+    按 bundle.json 把离线包恢复到项目目录：每个去重后的jar由一个线程解压一次
+    （每个线程使用自己的ZipFile句柄），解压时校验SHA-256，再复制到引用它的其他位置。
+    内容已一致的文件不会被改写。
+    """
+
+    def __init__(self, bundle_file: str, config_file: str, workers: int = None):
+        """初始化导入
+
+        Args:
+            bundle_file: 离线包路径
+            config_file: 导入后配置文件的路径，用于确定项目根目录
+            workers: 并行线程数
+        """
+        self.bundle_file = Path(bundle_file)
+        self.config_file = Path(config_file)
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self._local = threading.local()
+
+    def _zipfile(self) -> zipfile.ZipFile:
+        """获取当前线程的ZipFile句柄"""
+        zf = getattr(self._local, 'zipfile', None)
+        if zf is None:
+            zf = zipfile.ZipFile(self.bundle_file)
+            self._local.zipfile = zf
+            self._handles.append(zf)
+        return zf
+
+    def _target(self, rel: str) -> Path:
+        """把离线包中的相对路径解析为项目内的路径，拒绝指向项目之外的路径"""
+        target = (self.root / rel).resolve()
+        if target != self.root and self.root not in target.parents:
+            raise ValueError(f"离线包中的路径不在项目目录中: {rel}")
+        return target
+
+    @staticmethod
+    def _matches(path: Path, size: int, sha256: str) -> bool:
+        """判断已有文件是否与离线包中的内容一致"""
+        try:
+            return path.stat().st_size == size and file_sha256(path) == sha256
+        except OSError:
+            return False
+
+    def _restore_blob(self, sha256: str, targets: List[Tuple[Path, int]]) -> Tuple[int, int]:
+        """恢复一个jar内容到所有引用它的位置
+
+        Returns:
+            (写入的文件数, 跳过的文件数)
+        """
+        pending = [path for path, size in targets if not self._matches(path, size, sha256)]
+        if not pending:
+            return 0, len(targets)
+
+        first = pending[0]
+        first.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = first.with_name(f".{first.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        digest = hashlib.sha256()
+        try:
+            with self._zipfile().open(f"blobs/{sha256}.jar") as src, open(tmp_path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    dst.write(chunk)
+            if digest.hexdigest() != sha256:
+                raise ValueError(f"离线包中的jar已损坏: blobs/{sha256}.jar")
+            os.replace(tmp_path, first)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        for path in pending[1:]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            copy_file_fast(first, path)
+        return len(pending), len(targets) - len(pending)
+
+    def run(self) -> int:
+        """导入离线包
+
+        Returns:
+            写入的文件数
+        """
+        print(f"\n=== 导入离线包: {self.bundle_file} ===")
+        with zipfile.ZipFile(self.bundle_file) as zf:
+            manifest = json.loads(zf.read(BUNDLE_MANIFEST).decode('utf-8'))
+            self.root = (self.config_file.parent / manifest['root']).resolve()
+            texts = {self._target(rel): zf.read(f"texts/{rel}").decode('utf-8') for rel in manifest['texts']}
+
+        blobs = {}
+        for entry in manifest['files']:
+            blobs.setdefault(entry['sha256'], []).append((self._target(entry['path']), entry['size']))
+
+        self._handles = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(lambda item: self._restore_blob(*item), blobs.items()))
+        finally:
+            for zf in self._handles:
+                zf.close()
+        written = sum(count for count, _ in results)
+        skipped = sum(count for _, count in results)
+
+        for path, content in texts.items():
+            if write_if_changed(path, content):
+                written += 1
+            else:
+                skipped += 1
+
+        print(f"[OK] 项目目录: {self.root}")
+        print(f"     写入 {written} 个文件，跳过 {skipped} 个未变化的文件"
+              f"（{len(blobs)} 个jar内容，{len(texts)} 个文本文件）\n")
+        return written
+
+
+class BatchRunner:
+    """批量模式
+
+    在一个进程中处理多个配置文件：jar源目录相同的配置共用一个jar索引，
+    所有配置共用一个哈希缓存；各配置的操作编入同一个操作计划，在一个线程池中执行。
+    """
+
+    def __init__(self, config_files: List[Path], workers: int = None, **options):
+        """初始化批量处理
+
+        Args:
+            config_files: 配置文件列表
+            workers: 并行线程数
+            options: 传给每个LibManager的其他参数（incremental、link_mode等）
+        """
+        self.config_files = config_files
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.options = options
+        self.managers = []
+        self.errors = {}
+
+    @staticmethod
+    def find_configs(paths: List[str], name: str = DEFAULT_CONFIG_FILE) -> List[Path]:
+        """展开命令行中的配置文件和目录
+
+        目录会被递归搜索名为name的配置文件，跳过以点开头的目录和Maven的target目录。
+
+        Returns:
+            去重后的配置文件列表
+        """
+        found = []
+        for path in paths:
+            path = Path(path)
+            if not path.is_dir():
+                found.append(path)
+                continue
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != 'target')
+                if name in filenames:
+                    found.append(Path(dirpath) / name)
+        unique = []
+        seen = set()
+        for path in found:
+            key = path.resolve()
+            if key not in seen:
+                seen.add(key)
+                unique.append(path)
+        return unique
+
+    def _share_caches(self, manager: 'LibManager', hash_cache: HashCache, indexes: Dict):
+        """让管理器使用共享的哈希缓存和jar索引"""
+        manager.hash_cache = hash_cache
+        jar_sources = manager.config['jar_sources']
+        key = (tuple(manager._jar_roots()), jar_sources.get('precedence', 'first'))
+        if key not in indexes:
+            manager._get_jar_index()
+            indexes[key] = manager.jar_index
+        manager.jar_index = indexes[key]
+
+    def run(self, phases: List[str] = PLAN_PHASES, dry_run: bool = False) -> int:
+        """处理所有配置文件并打印汇总
+
+        Args:
+            phases: 包含的步骤，见 PLAN_PHASES / OPTIONAL_PLAN_PHASES
+            dry_run: 只打印合并后的操作计划（包括 --prune 将要删除的jar），不做任何修改
+
+        Returns:
+            失败的配置数
+        """
+        started = time.perf_counter()
+        print(f"=== 批量处理 {len(self.config_files)} 个配置文件 ===")
+        plan = OperationPlan()
+        hash_cache = None
+        indexes = {}
+        for config_file in self.config_files:
+            print(f"\n--- {config_file} ---")
+            try:
+                manager = LibManager(str(config_file), workers=self.workers, **self.options)
+                if hash_cache is None:
+                    hash_cache = HashCache(manager.cache_dir / HASH_CACHE_FILE)
+                self._share_caches(manager, hash_cache, indexes)
+                # 先编入单独的计划，完整生成后才并入共享计划，避免出错的配置只执行一部分操作
+                config_plan = manager.build_plan(phases)
+                plan.merge(config_plan)
+                self.managers.append((config_file, manager, len(config_plan.actions)))
+            except Exception as e:
+                self.errors[config_file] = e
+                print(f"[ERR] {config_file}: {e}")
+
+        if dry_run:
+            plan.print_plan()
+            return len(self.errors)
+
+        print(f"\n=== 执行操作计划（{len(plan.actions)} 个操作，{len(indexes)} 个共享jar索引） ===")
+        try:
+            plan.execute(self.workers)
+        except Exception as e:
+            self.errors[None] = e
+            print(f"[ERR] 执行失败: {e}")
+        if hash_cache is not None:
+            hash_cache.save()
+
+        self.print_summary(time.perf_counter() - started)
+        return len(self.errors)
+
+    def print_summary(self, elapsed: float):
+        """打印所有配置的汇总"""
+        print("\n=== 批量处理汇总 ===")
+        totals = {'copied': 0, 'linked': 0, 'skipped': 0, 'missing': 0, 'bytes_copied': 0}
+        for config_file, manager, actions in self.managers:
+            stats = manager.copy_stats
+            for key in totals:
+                totals[key] += stats[key]
+            modules = sum(1 for _ in manager._iter_module_configs())
+            status = "[ERR]" if stats['missing'] else "[OK]"
+            print(f"  {status} {config_file}: {modules} 个模块, {actions} 个操作, "
+                  f"复制 {stats['copied']}, 链接 {stats['linked']}, 跳过 {stats['skipped']}, "
+                  f"缺失 {stats['missing']}")
+        for config_file, error in self.errors.items():
+            if config_file is not None:
+                print(f"  [ERR] {config_file}: {error}")
+        print(f"共 {len(self.config_files)} 个配置，成功 {len(self.managers)} 个，"
+              f"失败 {len(self.config_files) - len(self.managers)} 个；"
+              f"复制 {totals['copied']} 个 ({format_size(totals['bytes_copied'])})，"
+              f"链接 {totals['linked']} 个，跳过 {totals['skipped']} 个，缺失 {totals['missing']} 个；"
+              f"耗时 {elapsed:.2f} 秒\n")
+
+
+class LibWatcher:
+    """监视模式
+
+    在内存中保留解析后的配置和jar索引，轮询配置文件和jar源目录，
+    只为发生变化的部分生成操作计划：
+    - 配置文件变化时重新加载，只改写内容发生变化的POM配置和README
+    - 源目录变化时只重新扫描该目录；被引用的jar大小或修改时间变化时只复制该jar
+    """
+
+    def __init__(self, manager: 'LibManager', output_file: str = None,
+                 interval: float = DEFAULT_WATCH_INTERVAL):
+        """初始化监视器
+
+        Args:
+            manager: 本地库管理器
+            output_file: POM配置输出路径
+            interval: 轮询间隔（秒）
+        """
+        self.manager = manager
+        self.output_file = Path(output_file) if output_file else manager.base_dir / "generated-pom-configs.xml"
+        self.interval = interval
+        self.config_stat = None
+        self.jar_state = {}
+        self.rendered = {}
+
+    def _config_changed(self) -> bool:
+        """检查配置文件大小或修改时间是否变化"""
+        try:
+            stat = self.manager.config_file.stat()
+        except OSError:
+            return False
+        key = (stat.st_size, stat.st_mtime_ns)
+        if key == self.config_stat:
+            return False
+        self.config_stat = key
+        return True
+
+    def _reload_config(self) -> bool:
+        """重新加载配置，解析失败时保留当前配置
+
+        Returns:
+            是否加载成功
+        """
+        manager = self.manager
+        try:
+            config = manager._load_config()
+        except (yaml.YAMLError, OSError, ValueError) as e:
+            print(f"[ERR] 配置文件无法解析，保留当前配置: {e}")
+            return False
+        manager.config = config
+        index = manager.jar_index
+        if index is not None and (index.roots != manager._jar_roots()
+                                  or index.precedence != config['jar_sources'].get('precedence', 'first')):
+            manager.jar_index = None
+        return True
+
+    def poll(self) -> OperationPlan:
+        """检查变化，生成只包含必要操作的计划"""
+        manager = self.manager
+        plan = OperationPlan()
+        first = self.config_stat is None
+        config_changed = self._config_changed()
+        if config_changed and not first:
+            print(f"\n[OK] 配置文件已变化: {manager.config_file}")
+            if not self._reload_config():
+                return plan
+
+        if manager.jar_index is None:
+            manager._get_jar_index()
+        elif manager.jar_index.refresh():
+            print(f"[OK] 重新扫描源目录: {', '.join(str(root) for root in manager.jar_index.rescanned)}")
+
+        if first:
+            manager._plan_setup(plan)
+            if manager.link_mode != 'copy':
+                jar_base = manager._resolve_path(manager.config['jar_sources']['base_dir'])
+                manager.jar_store = JarStore(jar_base / STORE_DIR, manager._get_hash_cache())
+        if manager.jar_store is not None or manager.incremental:
+            plan.add_finalizer(manager._get_hash_cache().save)
+
+        self._plan_jars(plan)
+        if config_changed:
+            try:
+                manager._complete_dependencies()
+            except ValueError as e:
+                print(f"[ERR] {e}")
+                return plan
+            self._plan_write(plan, self.output_file, manager._render_pom_config())
+            for module_config, module_name in manager._iter_module_configs():
+                if module_config is manager.config.get('common') and not module_config.get('dependencies'):
+                    continue
+                lib_dir = manager._resolve_path(module_config['lib_dir'])
+                self._plan_write(plan, lib_dir / "README.md",
+                                 manager._render_lib_readme(module_config, module_name), lib_dir)
+        return plan
+
+    def _plan_jars(self, plan: OperationPlan):
+        """为新增或变化的jar添加复制操作"""
+        manager = self.manager
+        jar_index = manager.jar_index
+        state = {}
+        for module_config, module_name in manager._iter_module_configs():
+            dependencies = module_config.get('dependencies') or []
+            if not dependencies:
+                continue
+            lib_dir = manager._resolve_path(module_config['lib_dir'])
+            manifest = None
+            for dep in dependencies:
+                jar_file = dep['jar_file']
+                dst_file = lib_dir / jar_file
+                src_file = jar_index.resolve(jar_file)
+                try:
+                    src_stat = src_file.stat() if src_file is not None else None
+                except FileNotFoundError:
+                    src_stat = None
+                key = (str(src_file), src_stat.st_size, src_stat.st_mtime_ns) if src_stat else None
+                state[dst_file] = key
+                if self.jar_state.get(dst_file, False) == key:
+                    continue
+                if key is None:
+                    print(f"  [ERR] [{module_name}] 源文件不存在: {jar_file}")
+                    continue
+                # 复制成功后才记录状态，失败的jar在下一轮重试
+                state[dst_file] = False
+                if manifest is None and manager.incremental:
+                    manifest = LibManifest(lib_dir)
+                    plan.add_finalizer(manifest.save)
+                action = manager._plan_jar(plan, src_file, src_stat, dst_file, manifest, module_name,
+                                           plan.mkdir(lib_dir))
+                action.func = partial(self._run_and_record, action.func, dst_file, key)
+        self.jar_state = state
+
+    def _run_and_record(self, func, dst_file: Path, key: Tuple):
+        """执行复制操作，成功后记录源文件状态"""
+        func()
+        self.jar_state[dst_file] = key
+
+    def _plan_write(self, plan: OperationPlan, path: Path, content: str, parent: Path = None):
+        """内容与上次写入的不同时添加写文件操作"""
+        if self.rendered.get(path) == content:
+            return
+
+        def write():
+            if write_if_changed(path, content):
+                log(f"  [OK] 更新: {path}")
+            self.rendered[path] = content
+
+        plan.add('write', path, write, len(content.encode('utf-8')), [plan.mkdir(parent)] if parent else None)
+
+    def run(self):
+        """持续监视，直到按Ctrl+C退出"""
+        manager = self.manager
+        print(f"=== 监视模式（每 {self.interval:g} 秒检查一次，Ctrl+C退出） ===")
+        print(f"配置文件: {manager.config_file}")
+        try:
+            while True:
+                started = time.perf_counter()
+                plan = self.poll()
+                if plan.actions:
+                    manager.copy_stats = manager._new_copy_stats()
+                    try:
+                        plan.execute(manager.workers)
+                    except OSError as e:
+                        print(f"[ERR] 同步失败: {e}")
+                    elapsed = (time.perf_counter() - started) * 1000
+                    print(f"[OK] 已同步 {len(plan.actions)} 个操作，耗时 {elapsed:.1f}ms")
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("\n监视已停止")
+
+
+def selected_phases(args) -> List[str]:
+    """命令行选择的计划步骤
+
+    --all 包含全部 PLAN_PHASES，显式指定的可选步骤（如 --prune）追加在后；
+    没有选择任何步骤时为 PLAN_PHASES。
+    """
+    phases = list(PLAN_PHASES) if args.all else [phase for phase in PLAN_PHASES if getattr(args, phase)]
+    phases += [phase for phase in OPTIONAL_PLAN_PHASES if getattr(args, phase)]
+    return phases or list(PLAN_PHASES)
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(
@@ -340,17 +3852,42 @@ def main():
         epilog="""
 示例用法:
   %(prog)s --config jars-config.yaml --all           # 执行所有操作
+  %(prog)s --config jars-config.yaml --plan          # 预览所有操作（不做修改）
+  %(prog)s --config jars-config.yaml --watch         # 监视配置和jar源目录，变化时自动同步
   %(prog)s --config jars-config.yaml --setup         # 只创建目录
   %(prog)s --config jars-config.yaml --copy          # 只复制jar文件
+  %(prog)s --config jars-config.yaml --copy --incremental  # 增量复制（跳过未变化的jar）
+  %(prog)s --config jars-config.yaml --copy --link-mode hardlink  # 去重存储并硬链接到lib目录
   %(prog)s --config jars-config.yaml --generate      # 只生成配置
   %(prog)s --config jars-config.yaml --readme        # 只生成README
+  %(prog)s --config jars-config.yaml --patch-poms    # 直接更新各模块pom.xml
+  %(prog)s --config jars-config.yaml --inspect       # 检查jar元数据并校验GAV坐标
+  %(prog)s --config jars-config.yaml --check-conflicts  # 检查各模块classpath中的类冲突
+  %(prog)s --config jars-config.yaml --check-deps    # 检查jar内嵌pom.xml声明的传递依赖
+  %(prog)s --config jars-config.yaml --plan --prune  # 预览将要删除的jar
+  %(prog)s --config jars-config.yaml --prune         # 删除lib目录中不再由配置引用的jar
+  %(prog)s --config jars-config.yaml --all --profile # 执行所有操作并输出运行剖析
+  %(prog)s --batch repo-a repo-b/jars-config.yaml    # 批量处理多个配置文件
+  %(prog)s --config jars-config.yaml --export-bundle # 导出离线包 jars-bundle.zip
+  %(prog)s --config jars-config.yaml --import-bundle jars-bundle.zip  # 在离线环境中导入
+  %(prog)s --config jars-config.yaml --lock          # 生成jars.lock
+  %(prog)s --config jars-config.yaml --verify        # 按jars.lock校验源jar和lib目录中的jar
+  %(prog)s --config jars-config.yaml --install-local-repo  # 直接安装jar到Maven本地仓库
         """
     )
 
     parser.add_argument(
         '--config',
-        default='jars-config.yaml',
-        help='配置文件路径 (默认: jars-config.yaml)'
+        default=DEFAULT_CONFIG_FILE,
+        help=f'配置文件路径 (默认: {DEFAULT_CONFIG_FILE})'
+    )
+
+    parser.add_argument(
+        '--batch',
+        nargs='+',
+        metavar='PATH',
+        help=f'批量模式：处理多个配置文件，目录会被递归搜索{DEFAULT_CONFIG_FILE}；'
+             f'共用jar索引和哈希缓存，可与--setup/--copy/--generate/--readme组合'
     )
 
     parser.add_argument(
@@ -388,26 +3925,235 @@ def main():
         help='生成的配置文件输出路径 (默认: generated-pom-configs.xml)'
     )
 
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help=f'增量同步：根据lib目录中的{MANIFEST_FILE}跳过未变化的jar'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help=f'并行复制线程数 (默认: {DEFAULT_WORKERS}，1表示串行)'
+    )
+
+    parser.add_argument(
+        '--link-mode',
+        choices=LINK_MODES,
+        default='copy',
+        help=f'jar同步方式：copy复制；hardlink/symlink将jar去重存储到jar源目录的{STORE_DIR}中并链接 (默认: copy)'
+    )
+
+    parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='只打印操作计划（含预计写入字节数），不做任何修改；可与--setup/--copy/--generate/--readme组合'
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='监视模式：常驻运行，配置文件或jar源目录变化时只同步受影响的jar、README和POM配置'
+    )
+
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+        help=f'监视模式的轮询间隔秒数 (默认: {DEFAULT_WATCH_INTERVAL})'
+    )
+
+    parser.add_argument(
+        '--patch-poms',
+        action='store_true',
+        help='直接更新各模块pom.xml中本工具管理的依赖和安装配置（保留格式，内容不变时不写文件）'
+    )
+
+    parser.add_argument(
+        '--install-local-repo',
+        action='store_true',
+        help='直接将jar安装到Maven本地仓库（跳过校验和一致的构件）'
+    )
+
+    parser.add_argument(
+        '--local-repo',
+        help='Maven本地仓库路径 (默认: settings.xml中的localRepository或~/.m2/repository)'
+    )
+
+    parser.add_argument(
+        '--pom-install',
+        choices=POM_INSTALL_MODES,
+        default='plugin',
+        help='生成的POM配置中本地jar的安装方式：plugin为maven-install-plugin，'
+             'local-repo为不生成插件（配合--install-local-repo），'
+             'profile为仅在本地仓库缺少jar时激活安装 (默认: plugin)'
+    )
+
+    parser.add_argument(
+        '--inspect',
+        action='store_true',
+        help='检查所有源目录中jar的Maven元数据，并校验配置中的GAV坐标'
+    )
+
+    parser.add_argument(
+        '--check-conflicts',
+        action='store_true',
+        help='检查各模块classpath（公共模块+自身依赖）中的重复类、拆分包和同一构件的多个版本'
+    )
+
+    parser.add_argument(
+        '--check-deps',
+        action='store_true',
+        help='读取jar内嵌的pom.xml，报告既不在本地lib中、也未由模块pom.xml管理、也不在Maven本地仓库中的传递依赖'
+    )
+
+    parser.add_argument(
+        '--prune',
+        action='store_true',
+        help='删除各lib目录中不再由配置引用的jar；与--plan组合时只列出将要删除的文件'
+    )
+
+    parser.add_argument(
+        '--lock',
+        action='store_true',
+        help=f'生成{LOCK_FILE}（与配置文件同目录），记录每个依赖jar的SHA-256和大小'
+    )
+
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help=f'按{LOCK_FILE}并行校验源jar和lib目录中jar的大小和SHA-256，不一致时以退出码1结束'
+    )
+
+    parser.add_argument(
+        '--export-bundle',
+        nargs='?',
+        const=DEFAULT_BUNDLE_FILE,
+        metavar='FILE',
+        help=f'导出离线包：去重后的jar、{LOCK_FILE}、生成的POM配置和README (默认: {DEFAULT_BUNDLE_FILE})'
+    )
+
+    parser.add_argument(
+        '--import-bundle',
+        metavar='FILE',
+        help='导入离线包，恢复到--config所在项目的对应位置（无需已有配置文件）'
+    )
+
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=DEFAULT_PROFILE_FILE,
+        metavar='FILE',
+        help=f'记录各步骤耗时、读写字节数、各源目录吞吐量和最慢的文件操作，'
+             f'写入JSON并打印摘要表 (默认文件: {DEFAULT_PROFILE_FILE})'
+    )
+
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=DEFAULT_PROFILE_TOP,
+        help=f'--profile 记录的最慢文件操作数量 (默认: {DEFAULT_PROFILE_TOP})'
+    )
+
     args = parser.parse_args()
 
     # 如果没有指定任何操作，默认执行全部
-    if not any([args.all, args.setup, args.copy, args.generate, args.readme]):
+    if not any([args.all, args.setup, args.copy, args.generate, args.readme, args.inspect,
+                args.install_local_repo, args.patch_poms, args.check_conflicts, args.check_deps, args.lock,
+                args.verify, args.prune, args.export_bundle]):
         args.all = True
 
+    if args.import_bundle:
+        try:
+            BundleImporter(args.import_bundle, args.config, workers=args.workers).run()
+        except Exception as e:
+            print(f"\n错误: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if args.batch:
+        # 批量模式只执行操作计划中的步骤，其他操作需要逐个配置运行
+        unsupported = [flag for flag, value in (
+            ('--watch', args.watch), ('--profile', args.profile), ('--lock', args.lock), ('--verify', args.verify),
+            ('--patch-poms', args.patch_poms), ('--install-local-repo', args.install_local_repo),
+            ('--inspect', args.inspect), ('--check-conflicts', args.check_conflicts),
+            ('--check-deps', args.check_deps), ('--export-bundle', args.export_bundle),
+            ('--import-bundle', args.import_bundle)) if value]
+        if unsupported:
+            parser.error(f"--batch 不支持 {', '.join(unsupported)}，"
+                         f"只能与 --all/--setup/--copy/--generate/--readme/--prune/--plan 组合")
+        config_files = BatchRunner.find_configs(args.batch)
+        if not config_files:
+            print(f"错误: 未找到配置文件: {' '.join(args.batch)}", file=sys.stderr)
+            sys.exit(1)
+        runner = BatchRunner(config_files, workers=args.workers, incremental=args.incremental,
+                             link_mode=args.link_mode, pom_install=args.pom_install, local_repo=args.local_repo)
+        if runner.run(selected_phases(args), dry_run=args.plan) > 0:
+            sys.exit(1)
+        return
+
     try:
-        manager = LibManager(args.config)
+        profiler = RunProfiler(enabled=bool(args.profile), top_n=args.profile_top)
+        with profiler.phase('load_config'):
+            manager = LibManager(args.config, incremental=args.incremental, workers=args.workers,
+                                 link_mode=args.link_mode, pom_install=args.pom_install,
+                                 local_repo=args.local_repo, profiler=profiler)
 
-        if args.all:
-            manager.run_all()
+        problems = 0
+        if args.watch:
+            LibWatcher(manager, args.output, args.watch_interval).run()
+        elif args.plan:
+            manager.build_plan(selected_phases(args), args.output).print_plan()
+        elif args.all:
+            manager.run_all(selected_phases(args))
         else:
             if args.setup:
-                manager.setup_directories()
+                with profiler.phase('setup'):
+                    manager.setup_directories()
             if args.copy:
-                manager.copy_jars()
+                with profiler.phase('copy'):
+                    manager.copy_jars()
+            if args.prune:
+                with profiler.phase('prune'):
+                    manager.prune_jars()
             if args.generate:
-                manager.generate_pom_config(args.output)
+                with profiler.phase('generate'):
+                    manager.generate_pom_config(args.output)
             if args.readme:
-                manager.generate_readme()
+                with profiler.phase('readme'):
+                    manager.generate_readme()
+
+        # 以下步骤不在操作计划中：单独指定，或与 --all 组合时在其后执行
+        if not (args.watch or args.plan):
+            if args.patch_poms:
+                with profiler.phase('patch_poms'):
+                    manager.patch_poms()
+            if args.install_local_repo:
+                with profiler.phase('install_local_repo'):
+                    manager.install_local_repo()
+            if args.lock:
+                with profiler.phase('lock'):
+                    manager.write_lock()
+            if args.export_bundle:
+                with profiler.phase('export_bundle'):
+                    manager.export_bundle(args.export_bundle)
+            if args.inspect:
+                with profiler.phase('inspect'):
+                    problems += manager.inspect_jars()
+            if args.check_conflicts:
+                with profiler.phase('check_conflicts'):
+                    problems += manager.check_conflicts()
+            if args.check_deps:
+                with profiler.phase('check_deps'):
+                    problems += manager.check_dependencies()
+            if args.verify:
+                with profiler.phase('verify'):
+                    problems += manager.verify_jars()
+
+        if args.profile:
+            profiler.write(Path(args.profile))
+        if problems > 0:
+            sys.exit(1)
 
     except Exception as e:
         print(f"\n错误: {e}", file=sys.stderr)
@@ -8,91 +8,583 @@ Maven多模块项目测试工具
 2. 测试API接口
 3. 生成测试报告
 4. 验证依赖关系
+5. 按模块依赖图并行运行各模块测试
+6. 单次Maven调用完成构建、依赖检查和测试（单reactor模式）
+7. 流式读取Maven输出：内存中只保留开头和结尾，完整日志压缩保存
+8. 读取Surefire/Failsafe测试报告，统计测试用例耗时
+9. 按git变更只测试受影响的模块及其下游模块
 """
 
 import os
+import re
 import sys
+import gzip
+import signal
 import subprocess
+import threading
 import time
 import json
 import argparse
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+# 检查是否依赖common模块的模块
+DEPENDENCY_CHECK_MODULES = ["service-a", "module-group/service-b"]
+
+# Maven日志中每个模块构建开始的分隔行，如 [INFO] ---------< com.example:common >---------
+REACTOR_PROJECT_PATTERN = re.compile(r'^\[INFO\] -+< ([^:\s]+):([^\s>]+) >-+\s*$')
+
+# Reactor Summary中的模块结果行，如 [INFO] Common Module ........ SUCCESS [  1.234 s]
+REACTOR_SUMMARY_PATTERN = re.compile(r'^\[INFO\] (.+?) [ .]*\b(SUCCESS|FAILURE|SKIPPED)\b')
+
+# surefire的测试汇总行（不含 Time elapsed 的为模块汇总）
+TESTS_RUN_PATTERN = re.compile(r'Tests run: (\d+), Failures: (\d+), Errors: (\d+), Skipped: (\d+)\s*$')
+
+# 内存中保留的Maven输出开头和结尾行数，其余只写入压缩日志
+LOG_HEAD_LINES = 50
+LOG_TAIL_LINES = 200
+
+# 报告中每项输出保留的字符数（开头1/4，结尾3/4，Maven的错误信息在结尾）
+REPORT_OUTPUT_CHARS = 1000
+
+# 各模块的测试报告目录（相对模块目录）
+TEST_REPORT_DIRS = ("target/surefire-reports", "target/failsafe-reports")
+
+# 报告中列出的最慢测试用例数
+DEFAULT_SLOWEST_TESTS = 10
+
+# 测试用例耗时分布的区间：(上限秒数, 名称)，None表示无上限
+DURATION_BUCKETS = ((0.1, "<0.1s"), (1.0, "0.1-1s"), (10.0, "1-10s"), (None, ">=10s"))
+
+# Maven进程结束后等待其输出读取完毕的秒数；超时说明还有子进程（如surefire的JVM）占用输出管道
+READER_JOIN_TIMEOUT = 5
+
+# 运行时实时显示的进度行
+PROGRESS_PATTERN = re.compile(r'^\[INFO\] Building |Tests run: |^\[ERROR\]|BUILD (SUCCESS|FAILURE)')
+
+
+class OutputCapture:
+    """子进程输出的有界捕获
+
+    逐行读取输出：内存中只保留开头 head_lines 行和结尾 tail_lines 行，
+    完整输出写入gzip压缩的日志文件，日志再大内存占用也不变。线程安全，
+    关闭后追加的行只保留在内存中。
+    """
+
+    def __init__(self, log_file: Optional[Path] = None, head_lines: int = LOG_HEAD_LINES,
+                 tail_lines: int = LOG_TAIL_LINES):
+        """初始化捕获
+
+        Args:
+            log_file: 完整日志文件路径（.log.gz），None表示不保存
+            head_lines: 保留的开头行数
+            tail_lines: 保留的结尾行数
+        """
+        self.log_file = log_file
+        self.head_lines = head_lines
+        self.head = []
+        self.tail = deque(maxlen=tail_lines)
+        self.lines = 0
+        self._spool = None
+        self._lock = threading.Lock()
+        if log_file is not None:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            # 压缩级别1：日志写入跟得上Maven输出，压缩率仍有约5倍
+            self._spool = gzip.open(log_file, 'wt', encoding='utf-8', compresslevel=1)
+
+    def feed(self, line: str):
+        """追加一行输出"""
+        line = line.rstrip('\r\n')
+        with self._lock:
+            self.lines += 1
+            if len(self.head) < self.head_lines:
+                self.head.append(line)
+            else:
+                self.tail.append(line)
+            if self._spool is not None:
+                self._spool.write(line + '\n')
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+
+    def text(self) -> str:
+        """保留的输出：开头 + 省略行数 + 结尾 + 完整日志路径"""
+        with self._lock:
+            omitted = self.lines - len(self.head) - len(self.tail)
+            parts = list(self.head)
+            if omitted > 0:
+                parts.append(f"... 省略 {omitted} 行 ...")
+            parts.extend(self.tail)
+        if self.log_file is not None:
+            parts.append(f"完整日志: {self.log_file}")
+        return '\n'.join(parts)
+
+
+class ReactorLogParser:
+    """逐行解析reactor日志，按模块记录构建结果、依赖树和测试汇总"""
+
+    def __init__(self, modules: Dict[str, Dict]):
+        """初始化解析器
+
+        Args:
+            modules: TestRunner.discover_modules 的结果
+        """
+        self.paths = {(info['group_id'], info['artifact_id']): path for path, info in modules.items()}
+        self.outcomes = {path: {'status': None, 'tree': [], 'tests': None} for path in modules}
+        # Reactor Summary中的模块名，Maven 3.6+ 会在部分模块名后附加版本号
+        self.summary_names = {
+            path: re.compile(re.escape(info['name'])
+                             + (f"(?: {re.escape(info['version'])})?" if info.get('version') else ''))
+            for path, info in modules.items()
+        }
+        self._current = None
+        self._in_tree = False
+        self._in_summary = False
+
+    def feed(self, line: str):
+        """解析一行日志"""
+        line = line.rstrip('\r\n')
+        match = REACTOR_PROJECT_PATTERN.match(line)
+        if match:
+            self._current = self.paths.get(match.groups())
+            self._in_tree = False
+            return
+        if 'Reactor Summary' in line:
+            self._current = None
+            self._in_summary = True
+            return
+
+        if self._in_summary:
+            match = REACTOR_SUMMARY_PATTERN.match(line)
+            if match:
+                for path, pattern in self.summary_names.items():
+                    if pattern.fullmatch(match.group(1)):
+                        self.outcomes[path]['status'] = match.group(2)
+            return
+        if self._current is None:
+            return
+
+        outcome = self.outcomes[self._current]
+        if line.startswith('[INFO] --- '):
+            # 插件执行的分隔行：只记录 dependency:tree 的输出
+            self._in_tree = 'maven-dependency-plugin' in line and ':tree' in line
+        elif line.startswith('[INFO] -----'):
+            self._in_tree = False
+        if self._in_tree:
+            outcome['tree'].append(line)
+        match = TESTS_RUN_PATTERN.search(line)
+        if match and 'Time elapsed' not in line:
+            outcome['tests'] = tuple(int(value) for value in match.groups())
 
 
 class TestRunner:
     """测试运行器"""
 
-    def __init__(self, project_dir: str = "."):
+    def __init__(self, project_dir: str = ".", workers: int = None, fail_fast: bool = False,
+                 single_reactor: bool = False, slowest: int = DEFAULT_SLOWEST_TESTS,
+                 affected_since: str = None):
         """初始化测试运行器
 
         Args:
             project_dir: 项目根目录
+            workers: 并行测试的模块数，默认为CPU数，1表示串行
+            fail_fast: 有模块测试失败时终止正在运行的测试，不再启动新的测试
+            single_reactor: 用一次mvn调用完成构建、依赖检查和测试
+            slowest: 报告中列出的最慢测试用例数
+            affected_since: git引用，只测试自该引用以来有变更的模块及其下游模块
         """
         self.project_dir = Path(project_dir).resolve()
         self.report_dir = self.project_dir / "test-reports"
         self.report_dir.mkdir(exist_ok=True)
         self.test_results = []
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.fail_fast = fail_fast
+        self.single_reactor = single_reactor
+        self.slowest = slowest
+        self.affected_since = affected_since
+        self.log_dir = self.report_dir / "logs"
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._cancelled = threading.Event()
+        self._processes = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read_pom(pom_file: Path) -> ET.Element:
+        """解析pom.xml并去掉元素名中的命名空间"""
+        root = ET.parse(pom_file).getroot()
+        for elem in root.iter():
+            if isinstance(elem.tag, str):
+                elem.tag = elem.tag.rsplit('}', 1)[-1]
+        return root
+
+    def discover_modules(self) -> Dict[str, Dict]:
+        """从根pom.xml的<modules>递归发现所有模块，并建立模块间的依赖图
+
+        聚合模块（packaging为pom）只用于继续查找子模块，不参与测试。
 
-    def run_maven_test(self, module: str = None) -> Tuple[bool, str]:
-        """运行Maven测试
+        Returns:
+            模块相对路径 -> {'group_id', 'artifact_id', 'version', 'name', 'depends_on': [模块相对路径, ...]}，
+            按依赖顺序排列（被依赖的模块在前）
+        """
+        modules = {}
+        dependencies = {}
+        pending = [(self.project_dir / "pom.xml", None, None)]
+        while pending:
+            pom_file, parent_group, parent_version = pending.pop(0)
+            root = self._read_pom(pom_file)
+            group_id = (root.findtext('groupId') or root.findtext('parent/groupId') or parent_group or '').strip()
+            version = (root.findtext('version') or root.findtext('parent/version') or parent_version or '').strip()
+            for child in root.findall('modules/module'):
+                child_pom = pom_file.parent / child.text.strip() / "pom.xml"
+                if child_pom.exists():
+                    pending.append((child_pom, group_id, version))
+            if (root.findtext('packaging') or 'jar').strip() == 'pom':
+                continue
+
+            path = pom_file.parent.relative_to(self.project_dir).as_posix()
+            artifact_id = (root.findtext('artifactId') or '').strip()
+            modules[path] = {
+                'group_id': group_id,
+                'artifact_id': artifact_id,
+                'version': version,
+                'name': (root.findtext('name') or artifact_id).strip(),
+                'depends_on': []
+            }
+            dependencies[path] = [
+                ((dep.findtext('groupId') or '').strip().replace('${project.groupId}', group_id),
+                 (dep.findtext('artifactId') or '').strip())
+                for dep in root.findall('dependencies/dependency')
+            ]
+
+        artifacts = {(info['group_id'], info['artifact_id']): path for path, info in modules.items()}
+        for path, keys in dependencies.items():
+            modules[path]['depends_on'] = [artifacts[key] for key in keys
+                                           if key in artifacts and artifacts[key] != path]
+        return {path: modules[path] for path in self._topological_order(modules)}
+
+    @staticmethod
+    def _topological_order(modules: Dict[str, Dict]) -> List[str]:
+        """按依赖顺序排列模块（保持原有顺序，循环依赖的模块排在最后）"""
+        order = []
+        done = set()
+        remaining = list(modules)
+        while remaining:
+            ready = [path for path in remaining if set(modules[path]['depends_on']) <= done]
+            if not ready:
+                order.extend(remaining)
+                break
+            for path in ready:
+                order.append(path)
+                done.add(path)
+                remaining.remove(path)
+        return order
+
+    def changed_files(self, ref: str) -> List[str]:
+        """获取自ref以来变更的文件（包括未提交的修改和未跟踪的文件）
+
+        Returns:
+            相对项目根目录的文件路径；项目目录之外的变更和本工具生成的报告不包含在内
+        """
+        commands = [
+            ["git", "diff", "--name-only", "--relative", ref, "--"],
+            ["git", "ls-files", "--others", "--exclude-standard"]
+        ]
+        files = []
+        for cmd in commands:
+            result = subprocess.run(cmd, cwd=self.project_dir, capture_output=True, text=True,
+                                    encoding='utf-8', errors='ignore')
+            if result.returncode != 0:
+                raise RuntimeError(f"{' '.join(cmd)} 失败: {result.stderr.strip()}")
+            files.extend(line.strip() for line in result.stdout.splitlines() if line.strip())
+        reports = self.report_dir.relative_to(self.project_dir).as_posix() + '/'
+        return sorted({path for path in files if not path.startswith(reports)})
+
+    @staticmethod
+    def affected_modules(modules: Dict[str, Dict], changed_files: List[str]) -> List[str]:
+        """根据变更文件计算需要测试的模块
+
+        文件归属于路径最长的包含它的模块；模块之外的pom.xml（父POM、聚合POM）
+        和 .mvn/ 目录的变更影响其所在目录下的所有模块，其余文件（文档、工具脚本等）忽略。
+        最后沿模块依赖图加入所有下游模块。
+
+        Returns:
+            受影响的模块相对路径，按modules的顺序
+        """
+        def contains(directory: str, path: str) -> bool:
+            return directory in ('', '.') or path == directory or path.startswith(directory + '/')
+
+        affected = set()
+        for path in changed_files:
+            owners = [module for module in modules if contains(module, path)]
+            if owners:
+                affected.add(max(owners, key=len))
+                continue
+            directory, _, name = path.rpartition('/')
+            if name == 'pom.xml' or path.startswith('.mvn/'):
+                if path.startswith('.mvn/'):
+                    directory = ''
+                affected.update(module for module in modules if contains(directory, module))
+
+        dependents = {}
+        for module, info in modules.items():
+            for dependency in info['depends_on']:
+                dependents.setdefault(dependency, []).append(module)
+        pending = list(affected)
+        while pending:
+            for dependent in dependents.get(pending.pop(), []):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        return [module for module in modules if module in affected]
+
+    def select_modules(self, results: Dict) -> Dict[str, Dict]:
+        """发现模块；指定了affected_since时只保留受影响的模块，并记录到 results["affected"]"""
+        modules = self.discover_modules()
+        if not self.affected_since:
+            return modules
+
+        changed = self.changed_files(self.affected_since)
+        selected = self.affected_modules(modules, changed)
+        results["affected"] = {
+            "since": self.affected_since,
+            "changed_files": len(changed),
+            "modules": selected
+        }
+        print(f"\n自 {self.affected_since} 以来变更 {len(changed)} 个文件，"
+              f"受影响的模块 {len(selected)}/{len(modules)} 个: {', '.join(selected) or '无'}")
+        return {module: modules[module] for module in selected}
+
+    def run_tests_parallel(self, modules: Dict[str, Dict]) -> Dict[str, Tuple[bool, str]]:
+        """按模块依赖图并行运行各模块测试
+
+        模块的所有依赖模块测试通过后才会启动，互不依赖的模块最多同时运行
+        workers 个。依赖模块失败时跳过该模块；fail_fast 时第一个失败会终止
+        正在运行的测试，其余模块不再启动。
 
         Args:
-            module: 模块名称，None表示测试所有模块
+            modules: discover_modules 的结果
 
         Returns:
-            (是否成功, 输出信息)
+            模块相对路径 -> (是否成功, 输出信息)，按modules的顺序
         """
-        cmd = ["mvn", "clean", "test"]
-        cwd = self.project_dir / module if module else self.project_dir
+        self._cancelled.clear()
+        pending = {path: set(info['depends_on']) & set(modules) for path, info in modules.items()}
+        results = {}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                # 依赖失败的模块会让其下游也变为可判定，反复查找直到没有新的模块就绪
+                changed = True
+                while changed:
+                    changed = False
+                    for path, deps in list(pending.items()):
+                        if self._cancelled.is_set():
+                            results[path] = (False, "fail-fast: 已有模块测试失败，未运行")
+                        elif not deps <= set(results):
+                            continue
+                        else:
+                            failed = sorted(dep for dep in deps if not results[dep][0])
+                            if failed:
+                                results[path] = (False, f"依赖模块失败，未运行: {', '.join(failed)}")
+                                print(f"  ⏭️  {path} 跳过（依赖模块失败: {', '.join(failed)}）")
+                            else:
+                                running[executor.submit(self.run_maven_test, path)] = path
+                        del pending[path]
+                        changed = True
+
+                if not running:
+                    # 剩余模块之间存在循环依赖
+                    for path in pending:
+                        results[path] = (False, "模块之间存在循环依赖，未运行")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    success, output = future.result()
+                    results[path] = (success, output)
+                    print(f"  {'✅' if success else '❌'} {path} 测试")
+                    if not success and self.fail_fast and not self._cancelled.is_set():
+                        print("  ⛔ fail-fast: 终止其余测试")
+                        self._cancel_running()
+
+        return {path: results[path] for path in modules}
+
+    def run_reactor(self, modules: Dict[str, Dict]) -> Tuple[bool, str, Dict[str, Dict]]:
+        """用一次mvn调用构建、列出依赖并测试所有模块
+
+        执行 mvn clean install dependency:tree -pl <模块> -am，JVM启动和依赖解析只发生一次。
+        测试失败不会中断构建（-Dmaven.test.failure.ignore=true），以便区分构建失败和测试失败；
+        非fail_fast时使用 -fae，某个模块构建失败后继续构建不依赖它的模块。
 
-        print(f"\n{'='*60}")
-        print(f" 运行Maven测试: {module or '所有模块'}")
-        print(f"{'='*60}")
+        Args:
+            modules: discover_modules 的结果
+
+        Returns:
+            (构建是否成功, 输出信息, 模块相对路径 -> {'status', 'tree', 'tests'})，
+            status为SUCCESS/FAILURE/SKIPPED（日志中没有该模块时为None），
+            tree为该模块 dependency:tree 的输出行，tests为 (运行数, 失败数, 错误数, 跳过数) 或None
+        """
+        cmd = ["mvn", "clean", "install", "dependency:tree", "-Dmaven.test.failure.ignore=true",
+               "-pl", ",".join(modules), "-am"]
+        if not self.fail_fast:
+            cmd.append("-fae")
+
+        print(f"\n{'='*60}\n 运行Maven: {' '.join(cmd)}\n{'='*60}")
+
+        parser = ReactorLogParser(modules)
+        try:
+            returncode, output = self._run_process(cmd, self.project_dir, "reactor", parser.feed)
+        except Exception as e:
+            return False, str(e), parser.outcomes
+
+        return returncode == 0, output, parser.outcomes
+
+    def _cancel_running(self):
+        """终止所有正在运行的Maven进程（连同其启动的surefire等子进程）"""
+        self._cancelled.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            self._kill_process_group(process)
+
+    @staticmethod
+    def _kill_process_group(process: subprocess.Popen, force: bool = False):
+        """向进程所在的进程组发送SIGTERM（force时为SIGKILL）
+
+        Maven进程在独立的会话中启动，进程组包含它fork的surefire/failsafe JVM；
+        只终止mvn时这些JVM会继续运行并占用输出管道。不支持进程组的平台（Windows）只终止该进程。
+        """
+        if hasattr(os, 'killpg'):
+            try:
+                os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+        elif process.poll() is None:
+            if force:
+                process.kill()
+            else:
+                process.terminate()
+
+    @staticmethod
+    def _read_output(process: subprocess.Popen, capture: OutputCapture, label: str,
+                     on_line: Callable[[str], None] = None):
+        """逐行读取进程输出直到管道关闭（在读取线程中运行）"""
+        for line in process.stdout:
+            capture.feed(line)
+            if on_line is not None:
+                on_line(line)
+            if PROGRESS_PATTERN.search(line):
+                print(f"  [{label}] {line.rstrip()}", flush=True)
+
+    def _run_process(self, cmd: List[str], cwd: Path, label: str,
+                     on_line: Callable[[str], None] = None) -> Tuple[int, str]:
+        """运行命令，逐行读取输出（标准错误合并到标准输出）
+
+        实时显示进度行，完整输出写入 test-reports/logs/<label>_<时间>.log.gz，
+        内存中只保留开头和结尾。进程会被记录，以便fail-fast时终止。
+        输出在单独的线程中读取：Maven退出后子进程仍占用输出管道时，
+        等待 READER_JOIN_TIMEOUT 秒后强制结束整个进程组，不会一直阻塞。
+
+        Args:
+            cmd: 命令
+            cwd: 工作目录
+            label: 日志名称和进度行前缀
+            on_line: 每行输出的回调（如reactor日志解析）
 
+        Returns:
+            (返回码, 保留的输出)
+        """
+        if self._cancelled.is_set():
+            return -1, "fail-fast: 已取消"
+        capture = OutputCapture(self.log_dir / f"{label.replace('/', '_')}_{self.run_id}.log.gz")
         try:
-            result = subprocess.run(
+            process = subprocess.Popen(
                 cmd,
                 cwd=cwd,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
                 encoding='utf-8',
-                errors='ignore'
+                errors='ignore',
+                start_new_session=True
             )
+            with self._lock:
+                self._processes.add(process)
+            try:
+                reader = threading.Thread(target=self._read_output, args=(process, capture, label, on_line),
+                                          daemon=True)
+                reader.start()
+                process.wait()
+                reader.join(READER_JOIN_TIMEOUT)
+                if reader.is_alive():
+                    capture.feed(f"进程已退出，{READER_JOIN_TIMEOUT} 秒后输出管道仍被子进程占用，强制结束进程组")
+                    self._kill_process_group(process, force=True)
+                    reader.join(READER_JOIN_TIMEOUT)
+            finally:
+                with self._lock:
+                    self._processes.discard(process)
+        finally:
+            capture.close()
+        if self._cancelled.is_set() and process.returncode != 0:
+            capture.feed("fail-fast: 已终止")
+        return process.returncode, capture.text()
+
+    def run_maven_test(self, module: str = None) -> Tuple[bool, str]:
+        """运行Maven测试
+
+        Args:
+            module: 模块名称，None表示测试所有模块
+
+        Returns:
+            (是否成功, 输出信息)
+        """
+        cmd = ["mvn", "clean", "test"]
+        cwd = self.project_dir / module if module else self.project_dir
 
-            success = result.returncode == 0
-            output = result.stdout + result.stderr
+        # 并行测试时多个线程同时输出，标题一次打印避免交错
+        print(f"\n{'='*60}\n 运行Maven测试: {module or '所有模块'}\n{'='*60}")
 
-            return success, output
+        try:
+            returncode, output = self._run_process(cmd, cwd, f"test-{module or 'all'}")
+            return returncode == 0, output
 
         except Exception as e:
             return False, str(e)
 
-    def run_maven_build(self) -> Tuple[bool, str]:
+    def run_maven_build(self, modules: List[str] = None, skip_tests: bool = False) -> Tuple[bool, str]:
         """运行完整构建
 
+        Args:
+            modules: 只构建这些模块及其上游模块（-pl/-am），None表示构建所有模块
+            skip_tests: 跳过测试（-DskipTests），测试随后由各模块单独运行
+
         Returns:
             (是否成功, 输出信息)
         """
+        cmd = ["mvn", "clean", "install"]
+        if modules is not None:
+            cmd += ["-pl", ",".join(modules), "-am"]
+        if skip_tests:
+            cmd.append("-DskipTests")
+
         print(f"\n{'='*60}")
-        print(" 运行完整构建: mvn clean install")
+        print(f" 运行完整构建: {' '.join(cmd)}")
         print(f"{'='*60}")
 
         try:
-            result = subprocess.run(
-                ["mvn", "clean", "install"],
-                cwd=self.project_dir,
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='ignore'
-            )
-
-            success = result.returncode == 0
-            output = result.stdout + result.stderr
-
-            return success, output
+            returncode, output = self._run_process(cmd, self.project_dir, "build")
+            return returncode == 0, output
 
         except Exception as e:
             return False, str(e)
@@ -109,23 +601,152 @@ class TestRunner:
         print(f"\n检查 {module} 的依赖树...")
 
         try:
-            result = subprocess.run(
-                ["mvn", "dependency:tree"],
-                cwd=self.project_dir / module,
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='ignore'
-            )
-
-            success = result.returncode == 0
-            output = result.stdout
-
-            return success, output
+            returncode, output = self._run_process(["mvn", "dependency:tree"], self.project_dir / module,
+                                                   f"tree-{module}")
+            return returncode == 0, output
 
         except Exception as e:
             return False, str(e)
 
+    @staticmethod
+    def parse_test_report(report_file: Path) -> List[Dict]:
+        """流式解析一个Surefire/Failsafe XML报告（TEST-*.xml）
+
+        使用iterparse逐个处理<testcase>，处理后立即释放，大报告也不会整体载入内存。
+
+        Returns:
+            [{'class', 'name', 'time', 'status', 'message'}, ...]，
+            status为passed/failed/error/skipped；文件无法解析时返回一个error用例
+        """
+        cases = []
+        suite_name = report_file.stem[len("TEST-"):]
+        try:
+            for _, elem in ET.iterparse(str(report_file), events=('end',)):
+                if elem.tag != 'testcase':
+                    continue
+                status = 'passed'
+                message = ''
+                for child in elem:
+                    if child.tag in ('failure', 'error', 'skipped'):
+                        status = 'failed' if child.tag == 'failure' else child.tag
+                        message = (child.get('message') or child.get('type') or '').strip()
+                        break
+                try:
+                    duration = float((elem.get('time') or '0').replace(',', ''))
+                except ValueError:
+                    duration = 0.0
+                cases.append({
+                    'class': elem.get('classname') or suite_name,
+                    'name': elem.get('name') or '',
+                    'time': duration,
+                    'status': status,
+                    'message': message[:200]
+                })
+                elem.clear()
+        except (ET.ParseError, OSError) as e:
+            cases.append({'class': suite_name, 'name': report_file.name, 'time': 0.0,
+                          'status': 'error', 'message': f"报告无法解析: {e}"})
+        return cases
+
+    def collect_test_reports(self, modules: Dict[str, Dict], since: float = None) -> Optional[Dict]:
+        """并行读取各模块的Surefire/Failsafe报告，统计测试用例耗时
+
+        Args:
+            modules: discover_modules 的结果
+            since: 只读取修改时间不早于该时间戳的报告，跳过之前运行留下的旧报告
+
+        Returns:
+            {'total_time', 'modules': {模块: {...}}, 'slowest': [...], 'distribution': [...], 'failed': [...]}；
+            没有任何报告时返回None
+        """
+        report_files = []
+        for module in modules:
+            for report_dir in TEST_REPORT_DIRS:
+                directory = self.project_dir / module / report_dir
+                if directory.is_dir():
+                    report_files.extend((module, path) for path in sorted(directory.glob("TEST-*.xml"))
+                                        if since is None or path.stat().st_mtime >= since)
+        if not report_files:
+            return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            parsed = list(executor.map(self.parse_test_report, [path for _, path in report_files]))
+
+        module_stats = {}
+        all_cases = []
+        for (module, _), cases in zip(report_files, parsed):
+            stats = module_stats.setdefault(module, {
+                'tests': 0, 'passed': 0, 'failed': 0, 'error': 0, 'skipped': 0, 'time': 0.0, 'classes': {}
+            })
+            for case in cases:
+                case['module'] = module
+                all_cases.append(case)
+                stats['tests'] += 1
+                stats[case['status']] += 1
+                stats['time'] += case['time']
+                cls = stats['classes'].setdefault(case['class'], {'tests': 0, 'time': 0.0, 'status': 'passed'})
+                cls['tests'] += 1
+                cls['time'] += case['time']
+                if case['status'] in ('failed', 'error'):
+                    cls['status'] = 'failed'
+
+        for stats in module_stats.values():
+            stats['time'] = round(stats['time'], 3)
+            stats['classes'] = [
+                {'name': name, 'tests': cls['tests'], 'time': round(cls['time'], 3), 'status': cls['status']}
+                for name, cls in sorted(stats['classes'].items(), key=lambda item: -item[1]['time'])
+            ]
+
+        total_time = sum(case['time'] for case in all_cases)
+        distribution = []
+        lower = 0.0
+        for upper, label in DURATION_BUCKETS:
+            in_bucket = [case['time'] for case in all_cases
+                         if case['time'] >= lower and (upper is None or case['time'] < upper)]
+            distribution.append({
+                'range': label,
+                'tests': len(in_bucket),
+                'time': round(sum(in_bucket), 3),
+                'share': f"{(sum(in_bucket) / total_time * 100):.1f}%" if total_time > 0 else "0%"
+            })
+            lower = upper
+
+        def case_summary(case):
+            return {key: case[key] for key in ('module', 'class', 'name', 'time', 'status', 'message')}
+
+        return {
+            'total_time': round(total_time, 3),
+            'modules': {module: module_stats[module] for module in modules if module in module_stats},
+            'slowest': [case_summary(case) for case in heapq.nlargest(self.slowest, all_cases,
+                                                                      key=lambda case: case['time'])],
+            'distribution': distribution,
+            'failed': [case_summary(case) for case in all_cases if case['status'] in ('failed', 'error')]
+        }
+
+    def _add_test_timing(self, results: Dict, modules: Dict[str, Dict], since: float = None):
+        """读取本次运行生成的测试报告，把耗时统计写入 results["test_timing"] 并打印摘要"""
+        timing = self.collect_test_reports(modules, since)
+        if timing is None:
+            return
+        results["test_timing"] = timing
+
+        print(f"\n  测试用例总耗时 {timing['total_time']:.2f} 秒")
+        for module, stats in timing['modules'].items():
+            print(f"    {module}: {stats['tests']} 个用例, {stats['time']:.2f} 秒"
+                  f" (失败 {stats['failed']}, 错误 {stats['error']}, 跳过 {stats['skipped']})")
+        if timing['slowest']:
+            print(f"  最慢的 {len(timing['slowest'])} 个测试:")
+            for case in timing['slowest']:
+                print(f"    {case['time']:8.3f}s  {case['class']}.{case['name']} [{case['module']}]")
+
+    @staticmethod
+    def _excerpt(output: str, limit: int = REPORT_OUTPUT_CHARS) -> str:
+        """截取报告中的输出：保留开头和结尾（Maven的错误信息在结尾）"""
+        if len(output) <= limit:
+            return output
+        head = limit // 4
+        return output[:head] + "\n...\n" + output[-(limit - head):]
+
     def test_api_endpoint(self, url: str, expected_keys: List[str] = None) -> Tuple[bool, Dict]:
         """测试API接口
 
@@ -160,21 +781,31 @@ class TestRunner:
         Returns:
             测试结果字典
         """
+        if self.single_reactor:
+            return self.run_single_reactor_test()
+
         results = {
             "timestamp": datetime.now().isoformat(),
             "tests": []
         }
 
+        modules = self.select_modules(results)
+        if not modules:
+            self._summarize(results)
+            return results
+
         # 1. 测试构建
         print("\n" + "="*60)
         print(" 第1步: 测试Maven构建")
         print("="*60)
 
-        build_success, build_output = self.run_maven_build()
+        # 测试在第3步按模块并行运行，构建时跳过，避免每个测试运行两次
+        build_success, build_output = self.run_maven_build(list(modules) if self.affected_since else None,
+                                                           skip_tests=True)
         results["tests"].append({
             "name": "Maven构建",
             "passed": build_success,
-            "output": build_output[:1000] if len(build_output) > 1000 else build_output
+            "output": self._excerpt(build_output)
         })
 
         if not build_success:
@@ -194,13 +825,14 @@ class TestRunner:
         print(" 第2步: 检查模块依赖")
         print("="*60)
 
-        modules = ["service-a", "module-group/service-b"]
-        for module in modules:
+        for module in DEPENDENCY_CHECK_MODULES:
+            if module not in modules:
+                continue
             dep_success, dep_output = self.check_dependency_tree(module)
             results["tests"].append({
                 "name": f"{module}依赖检查",
                 "passed": dep_success,
-                "output": dep_output[:1000] if len(dep_output) > 1000 else dep_output
+                "output": self._excerpt(dep_output)
             })
 
             if dep_success:
@@ -220,18 +852,121 @@ class TestRunner:
         print(" 第3步: 运行单元测试")
         print("="*60)
 
-        test_modules = ["common", "service-a", "module-group/service-b"]
-        for module in test_modules:
-            test_success, test_output = self.run_maven_test(module)
+        print(f"  测试 {len(modules)} 个模块，并行数 {self.workers}")
+        tests_started = int(time.time())  # 按整秒比较，兼容修改时间精度为1秒的文件系统
+        for module, (test_success, test_output) in self.run_tests_parallel(modules).items():
+            results["tests"].append({
+                "name": f"{module}单元测试",
+                "passed": test_success,
+                "output": self._excerpt(test_output)
+            })
+
+        self._add_test_timing(results, modules, tests_started)
+        self._summarize(results)
+        return results
+
+    def run_single_reactor_test(self) -> Dict:
+        """在一次mvn调用中运行完整测试套件
+
+        步骤和结果格式与逐个模块运行时相同，各步骤的结果从同一份reactor日志中读取。
+
+        Returns:
+            测试结果字典
+        """
+        results = {
+            "timestamp": datetime.now().isoformat(),
+            "tests": []
+        }
+
+        modules = self.select_modules(results)
+        if not modules:
+            self._summarize(results)
+            return results
+
+        reactor_started = int(time.time())
+        build_success, build_output, outcomes = self.run_reactor(modules)
+
+        # 1. 构建（测试失败不计入构建结果）
+        print("\n" + "="*60)
+        print(" 第1步: 测试Maven构建")
+        print("="*60)
+
+        results["tests"].append({
+            "name": "Maven构建",
+            "passed": build_success,
+            "output": self._excerpt(build_output)
+        })
+
+        if not build_success:
+            print("❌ 构建失败，停止后续测试")
+            for path, outcome in outcomes.items():
+                print(f"  {'✅' if outcome['status'] == 'SUCCESS' else '❌'} {path}: {outcome['status'] or '未构建'}")
+            results["summary"] = {
+                "total": 1,
+                "passed": 0,
+                "failed": 1,
+                "success_rate": "0%"
+            }
+            return results
+
+        print("✅ 构建成功")
+
+        # 2. 依赖检查：dependency:tree 的输出在各模块日志中
+        print("\n" + "="*60)
+        print(" 第2步: 检查模块依赖")
+        print("="*60)
+
+        for module in DEPENDENCY_CHECK_MODULES:
+            if module not in modules:
+                continue
+            outcome = outcomes[module]
+            dep_success = outcome['status'] == 'SUCCESS' and bool(outcome['tree'])
+            dep_output = '\n'.join(outcome['tree'])
+            results["tests"].append({
+                "name": f"{module}依赖检查",
+                "passed": dep_success,
+                "output": self._excerpt(dep_output)
+            })
+
+            if dep_success:
+                has_common = "com.example:common" in dep_output
+                results["tests"].append({
+                    "name": f"{module}包含common依赖",
+                    "passed": has_common,
+                    "output": "找到common模块依赖" if has_common else "未找到common模块依赖"
+                })
+                print(f"  {'✅' if has_common else '❌'} {module} 依赖common模块")
+            else:
+                print(f"  ❌ {module} 依赖检查失败")
+
+        # 3. 单元测试：读取各模块的surefire汇总行
+        print("\n" + "="*60)
+        print(" 第3步: 运行单元测试")
+        print("="*60)
+
+        for module, outcome in outcomes.items():
+            tests = outcome['tests']
+            test_success = outcome['status'] == 'SUCCESS' and (tests is None or tests[1] + tests[2] == 0)
+            if tests is not None:
+                test_output = f"Tests run: {tests[0]}, Failures: {tests[1]}, Errors: {tests[2]}, Skipped: {tests[3]}"
+            else:
+                test_output = "没有测试" if outcome['status'] == 'SUCCESS' else f"模块状态: {outcome['status']}"
             results["tests"].append({
                 "name": f"{module}单元测试",
                 "passed": test_success,
-                "output": test_output[:1000] if len(test_output) > 1000 else test_output
+                "output": test_output
             })
 
-            print(f"  {'✅' if test_success else '❌'} {module} 测试")
+            print(f"  {'✅' if test_success else '❌'} {module} 测试 ({test_output})")
 
-        # 统计结果
+        self._add_test_timing(results, modules, reactor_started)
+
+        self._summarize(results)
+        return results
+
+    @staticmethod
+    def _summarize(results: Dict):
+        """统计结果，写入 results["summary"]"""
         total_tests = len(results["tests"])
         passed_tests = sum(1 for t in results["tests"] if t["passed"])
         failed_tests = total_tests - passed_tests
@@ -244,8 +979,6 @@ class TestRunner:
             "success_rate": success_rate
         }
 
-        return results
-
     def generate_report(self, results: Dict, format: str = "markdown") -> str:
         """生成测试报告
 
@@ -282,6 +1015,10 @@ class TestRunner:
         lines = []
         lines.append("# Maven多模块项目测试报告\n")
         lines.append(f"**测试时间**: {results['timestamp']}\n")
+        if results.get('affected'):
+            affected = results['affected']
+            lines.append(f"**变更范围**: 自 `{affected['since']}` 以来变更 {affected['changed_files']} 个文件，"
+                         f"测试受影响的模块: {', '.join(affected['modules']) or '无'}\n")
         lines.append("## 测试总结\n")
 
         summary = results['summary']
@@ -300,6 +1037,34 @@ class TestRunner:
             output = test['output'][:50] + "..." if len(test['output']) > 50 else test['output']
             lines.append(f"| {name} | {status} | {output} |")
 
+        timing = results.get('test_timing')
+        if timing:
+            lines.append("\n## 测试耗时\n")
+            lines.append(f"测试用例总耗时: {timing['total_time']:.2f} 秒\n")
+            lines.append("| 模块 | 用例数 | 失败 | 错误 | 跳过 | 耗时(秒) |")
+            lines.append("|------|--------|------|------|------|----------|")
+            for module, stats in timing['modules'].items():
+                lines.append(f"| {module} | {stats['tests']} | {stats['failed']} | {stats['error']} | "
+                             f"{stats['skipped']} | {stats['time']:.2f} |")
+
+            lines.append("\n### 耗时分布\n")
+            lines.append("| 单个用例耗时 | 用例数 | 总耗时(秒) | 占比 |")
+            lines.append("|--------------|--------|------------|------|")
+            for bucket in timing['distribution']:
+                lines.append(f"| {bucket['range']} | {bucket['tests']} | {bucket['time']:.2f} | {bucket['share']} |")
+
+            lines.append("\n### 最慢的测试\n")
+            lines.append("| 测试 | 模块 | 状态 | 耗时(秒) |")
+            lines.append("|------|------|------|----------|")
+            for case in timing['slowest']:
+                lines.append(f"| {case['class']}.{case['name']} | {case['module']} | {case['status']} | "
+                             f"{case['time']:.3f} |")
+
+            if timing['failed']:
+                lines.append("\n### 失败的测试\n")
+                for case in timing['failed']:
+                    lines.append(f"- `{case['class']}.{case['name']}` [{case['module']}]: {case['message']}")
+
         lines.append("\n## 建议\n")
 
         if summary['failed'] == 0:
@@ -431,6 +1196,38 @@ class TestRunner:
         html += '''
         </tbody>
     </table>
+'''
+
+        timing = results.get('test_timing')
+        if timing:
+            html += f'''
+    <h2>测试耗时（共 {timing['total_time']:.2f} 秒）</h2>
+    <table>
+        <thead>
+            <tr>
+                <th>最慢的测试</th>
+                <th>模块</th>
+                <th>状态</th>
+                <th>耗时(秒)</th>
+            </tr>
+        </thead>
+        <tbody>
+'''
+            for case in timing['slowest']:
+                html += f'''
+            <tr>
+                <td>{case['class']}.{case['name']}</td>
+                <td>{case['module']}</td>
+                <td>{case['status']}</td>
+                <td>{case['time']:.3f}</td>
+            </tr>
+'''
+            html += '''
+        </tbody>
+    </table>
+'''
+
+        html += '''
 </body>
 </html>
 '''
@@ -464,43 +1261,85 @@ def main():
         help='只运行构建测试'
     )
 
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='同时测试的模块数，按模块依赖图调度 (默认: CPU数，1表示串行)'
+    )
+
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='有模块测试失败时终止正在运行的测试，不再启动其余模块'
+    )
+
+    parser.add_argument(
+        '--slowest',
+        type=int,
+        default=DEFAULT_SLOWEST_TESTS,
+        help=f'报告中列出的最慢测试用例数 (默认: {DEFAULT_SLOWEST_TESTS})'
+    )
+
+    parser.add_argument(
+        '--affected-since',
+        metavar='REF',
+        help='只构建和测试自git引用REF以来有变更的模块及依赖它们的下游模块（如 origin/main）'
+    )
+
+    parser.add_argument(
+        '--single-reactor',
+        action='store_true',
+        help='用一次mvn调用（-pl/-am）完成构建、依赖检查和测试，JVM启动和依赖解析只发生一次'
+    )
+
     args = parser.parse_args()
 
     print("=" * 60)
     print(" Maven多模块项目测试工具")
     print("=" * 60)
 
-    runner = TestRunner(args.project_dir)
-
-    if args.build_only:
-        success, output = runner.run_maven_build()
-        print("\n构建结果:", "✅ 成功" if success else "❌ 失败")
-    else:
+    runner = TestRunner(args.project_dir, workers=args.workers, fail_fast=args.fail_fast,
+                        single_reactor=args.single_reactor, slowest=args.slowest,
+                        affected_since=args.affected_since)
+
+    try:
+        if args.build_only:
+            modules = runner.select_modules({}) if args.affected_since else None
+            if modules is not None and not modules:
+                print("\n没有受影响的模块，跳过构建")
+                return
+            success, output = runner.run_maven_build(list(modules) if modules is not None else None)
+            print("\n构建结果:", "✅ 成功" if success else "❌ 失败")
+            return
         results = runner.run_full_test()
+    except RuntimeError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
 
-        # 生成报告
-        print("\n" + "=" * 60)
-        print(" 生成测试报告")
-        print("=" * 60)
+    # 生成报告
+    print("\n" + "=" * 60)
+    print(" 生成测试报告")
+    print("=" * 60)
 
-        report_file = runner.generate_report(results, args.format)
-        print(f"✅ 报告已生成: {report_file}")
+    report_file = runner.generate_report(results, args.format)
+    print(f"✅ 报告已生成: {report_file}")
 
-        # 显示摘要
-        print("\n" + "=" * 60)
-        print(" 测试摘要")
-        print("=" * 60)
-        summary = results['summary']
-        print(f"总测试数: {summary['total']}")
-        print(f"通过: {summary['passed']} ✅")
-        print(f"失败: {summary['failed']} ❌")
-        print(f"成功率: {summary['success_rate']}")
-
-        if summary['failed'] > 0:
-            print("\n⚠️  存在失败的测试，请查看报告了解详情")
-            sys.exit(1)
-        else:
-            print("\n🎉 所有测试通过！")
+    # 显示摘要
+    print("\n" + "=" * 60)
+    print(" 测试摘要")
+    print("=" * 60)
+    summary = results['summary']
+    print(f"总测试数: {summary['total']}")
+    print(f"通过: {summary['passed']} ✅")
+    print(f"失败: {summary['failed']} ❌")
+    print(f"成功率: {summary['success_rate']}")
+
+    if summary['failed'] > 0:
+        print("\n⚠️  存在失败的测试，请查看报告了解详情")
+        sys.exit(1)
+    else:
+        print("\n🎉 所有测试通过！")
 
 
 if __name__ == '__main__':